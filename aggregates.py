@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+
+# ——— Race × Score Aggregates ———
+# Everything the Fun Data Corner race charts draw, reduced to a few rows per
+# race group so Plotly receives summaries instead of one point per profile.
+RACE_GROUPS = {"asian": "Asian", "white": "White", "black": "Black", "hispanic": "Hispanic"}
+SCORE_RANGE = (1100, 1600)
+SCORE_BINS = list(range(1100, 1601, 50))
+SCORE_LABELS = [f"{b}-{b+49}" for b in SCORE_BINS[:-1]]
+
+
+def race_scores(df):
+    """(race group, unified score) arrays for profiles the race charts cover.
+
+    Reads the precomputed Eth_norm and SAT_Adjusted columns; the frame
+    itself is never modified.
+    """
+    eth = df['Eth_norm']
+    # One label per category, plus "" for code -1 (missing)
+    labels = np.array([RACE_GROUPS.get(c, "") for c in eth.cat.categories] + [""], dtype=object)
+    race = labels[eth.cat.codes.to_numpy()]
+    score = df['SAT_Adjusted'].to_numpy(dtype="float64", na_value=np.nan)
+    keep = (race != "") & (score >= SCORE_RANGE[0]) & (score <= SCORE_RANGE[1])
+    return race[keep], score[keep]
+
+
+def box_stats(values):
+    """Plotly's box-plot statistics (linear quartiles, 1.5 IQR fences) plus p10/p90."""
+    p10, q1, median, q3, p90 = np.percentile(values, [10, 25, 50, 75, 90])
+    iqr = q3 - q1
+    return {
+        "n": len(values),
+        "mean": float(values.mean()),
+        "p10": p10, "q1": q1, "median": median, "q3": q3, "p90": p90,
+        "lowerfence": float(values[values >= q1 - 1.5 * iqr].min()),
+        "upperfence": float(values[values <= q3 + 1.5 * iqr].max()),
+    }
+
+
+def race_box_stats(race, score):
+    """One row of box_stats() per race group present, in RACE_GROUPS order."""
+    rows = {
+        group: box_stats(score[race == group])
+        for group in RACE_GROUPS.values() if (race == group).any()
+    }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def race_bucket_shares(race, score):
+    """Profiles per (race, 50-point score bucket) and their share of the race."""
+    buckets = pd.cut(score, bins=SCORE_BINS, labels=SCORE_LABELS, right=False)
+    counts = (
+        pd.DataFrame({'RaceNorm': race, 'Score_Bucket': buckets})
+          .groupby(['RaceNorm', 'Score_Bucket'], observed=True)
+          .size()
+          .reset_index(name='Count')
+    )
+    counts['Percent'] = counts['Count'] / counts.groupby('RaceNorm')['Count'].transform('sum') * 100
+    return counts
+
+
+def race_aggregates(df):
+    """Box statistics and bucket shares for one dataset version."""
+    race, score = race_scores(df)
+    return {"box": race_box_stats(race, score), "buckets": race_bucket_shares(race, score)}
+
+
+# ——— Per-school Scatter ———
+GPA_AXIS = (3.0, 4.0)
+# Heatmap cells of 0.02 GPA × 20 score points over the chart axes
+DENSITY_BINS = (50, 25)
+
+
+def school_points(ds, school):
+    """GPA and unified score of every profile accepted to school.
+
+    school is a canonical name or any search term the college index
+    resolves. Rows come from the college index and values from the score index's
+    column arrays, so no frame rows are touched. Profiles missing either
+    value are dropped.
+    """
+    rows = ds.college_index.school_rows(school)
+    if not len(rows):
+        rows = ds.college_index.rows_for(school.lower())
+    gpa, score = ds.score_index.gpa[rows], ds.score_index.score[rows]
+    ok = np.isfinite(gpa) & np.isfinite(score)
+    return gpa[ok], score[ok]
+
+
+def density_grid(gpa, score, bins=DENSITY_BINS):
+    """(counts, GPA bin centers, score bin centers) for a density heatmap.
+
+    counts is indexed [score bin, GPA bin], the orientation go.Heatmap expects.
+    """
+    counts, gpa_edges, score_edges = np.histogram2d(gpa, score, bins=bins, range=[GPA_AXIS, SCORE_RANGE])
+    return counts.T, (gpa_edges[:-1] + gpa_edges[1:]) / 2, (score_edges[:-1] + score_edges[1:]) / 2
+
+
+# ——— Per-school Statistics ———
+QUARTILES = {"25th": 0.25, "median": 0.5, "75th": 0.75}
+
+
+def _category_shares(codes, school, n_schools, categories):
+    # Per-school share of each category, from one bincount over (school, code)
+    n_cat = len(categories)
+    codes = np.where(codes < 0, n_cat, codes)  # missing -> extra column
+    counts = np.bincount(school * (n_cat + 1) + codes, minlength=n_schools * (n_cat + 1))
+    counts = counts.reshape(n_schools, n_cat + 1)[:, :n_cat]
+    totals = np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    return pd.DataFrame(counts / totals * 100, columns=[f"% {c.title()}" for c in categories])
+
+
+def school_stats(ds):
+    """One row per canonical school: acceptances, GPA and unified score
+    quartiles, and the ethnicity and gender mix of its admits.
+
+    Every posting of the college index is one (school, profile) pair, so
+    the table is a handful of grouped reductions over the postings array.
+    """
+    postings = ds.college_index.postings
+    per_school = np.diff(postings.offsets)
+    n_schools = len(postings.terms)
+    school = np.repeat(np.arange(n_schools), per_school)
+    rows = postings.rows
+    df = ds.frame
+
+    long = pd.DataFrame({
+        "school": school,
+        "GPA": ds.score_index.gpa[rows],
+        "Score": ds.score_index.score[rows],
+    })
+    quartiles = long.groupby("school")[["GPA", "Score"]].quantile(list(QUARTILES.values())).unstack()
+    quartiles = quartiles.reindex(range(n_schools))
+
+    stats = pd.DataFrame({"Acceptances": per_school})
+    for col in ("GPA", "Score"):
+        for label, q in QUARTILES.items():
+            stats[f"{col} {label}"] = quartiles[(col, q)].to_numpy()
+    for col in ("Eth_norm", "Gen_norm"):
+        # Shares are of all admits; the unknown bucket is implied by the rest
+        codes = df[col].cat.codes.to_numpy()[rows]
+        shares = _category_shares(codes, school, n_schools, list(df[col].cat.categories))
+        stats = stats.join(shares.drop(columns="% Unknown", errors="ignore"))
+    stats.index = pd.Index(postings.terms, name="School")
+    return stats
@@ -1,183 +1,148 @@
 
 import streamlit as st
-import pandas as pd
 import re
-import string
-import textwrap
 from datetime import datetime, timedelta
 from datetime import date, time
 from difflib import get_close_matches
-from collections import Counter
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+import hashlib
 import io
 import os
-import smtplib
-from email.message import EmailMessage
-from fpdf import FPDF
 from math import ceil
-import spacy
-from io import BytesIO
-from docx import Document
-
-
-# ——— Stopwords & Keyword Extraction ———
-STOPWORDS = {
-    "a","an","the","and","or","but","if","then","with","on","in",
-    "at","by","for","of","to","from","is","are","was","were","it",
-    "this","that","these","those","as","be","has","have","had","i",
-    "you","he","she","we","they","them","his","her","my","your",
-}
-
-def extract_keywords(text):
-    text = text.translate(str.maketrans("", "", string.punctuation))
-    tokens = text.lower().split()
-    return [t for t in tokens if t not in STOPWORDS]
-
-# ——— Normalization Helpers ———
-def normalize_ethnicity(ethnicity):
-    if pd.isna(ethnicity):
-        return "unknown"
-    e = ethnicity.lower()
-    if any(x in e for x in ["indian","south asian","asian"]):
-        return "asian"
-    if "white" in e or "caucasian" in e:
-        return "white"
-    if "black" in e or "african american" in e:
-        return "black"
-    if "hispanic" in e or "latino" in e or "latina" in e or "latinx" in e:
-        return "hispanic"
-    if "native american" in e or "indigenous" in e:
-        return "native american"
-    if "middle eastern" in e or "arab" in e:
-        return "middle eastern"
-    return "other"
-
-def normalize_gender(gender):
-    if pd.isna(gender):
-        return "unknown"
-    g = str(gender).strip().lower()
-    if g in ['male','m']:
-        return 'male'
-    if g in ['female','f']:
-        return 'female'
-    return 'unknown'
-
-def clean_acceptances(raw):
-    if pd.isna(raw) or not raw.strip():
-        return ""
-    parts = re.split(r"[\n,]+", raw)
-    bad_kw = {
-        "club","volunteer","internship","hook","income","essay",
-        "activity","award","reflection","summary","miscellaneous",
-        "consideration","recommendation","research","grades"
-    }
-    school_kw = {
-        "university","college","institute","state","academy","school",
-        "tech","polytechnic","poly","mit","stanford","harvard","princeton","yale"
-    }
-    good = []
-    for p in parts:
-        pl = p.strip().lower()
-        if not pl or any(b in pl for b in bad_kw):
-            continue
-        if any(s in pl for s in school_kw) or pl in {"ea","ed","rea","rd"} or len(pl.split())<=8:
-            good.append(p.strip())
-    joined = ", ".join(good)
-    return joined if len(joined)<=250 else ""
-
-def match_profiles(df, gpa, sat, act, eth, gen, ec_query, use_gpa=True):
-    df['Eth_norm'] = df['Ethnicity'].apply(normalize_ethnicity)
-    df['Gen_norm'] = df['Gender'].apply(normalize_gender)
-    df['acc_clean'] = df['acceptances'].apply(clean_acceptances)
-    d = df[df['acc_clean']!=""].copy()
-
-    if eth!="No filter":
-        d = d[d['Eth_norm']==eth.lower()]
-    if gen!="No filter":
-        d = d[d['Gen_norm']==gen.lower()]
-
-    if use_gpa and gpa is not None:
-        d = d[(d['GPA']>=gpa-0.05)&(d['GPA']<=gpa+0.05)]
-
-    if sat is not None:
-        d = d[d['SAT_Score'].apply(lambda x: abs(x-sat)<=30 if not pd.isna(x) else False)]
-    if act is not None:
-        d = d[d['ACT_Score'].apply(lambda x: abs(x-act)<=1 if not pd.isna(x) else False)]
-
-    d['EC_matches'] = [[] for _ in range(len(d))]
+from data_loader import CACHE_DIR, load_dataset, refresh_data, shared_generation
+from normalize import extract_keywords
+from filters import college_rows, ec_rows, profile_rows
+from neighbors import closest_twins
+from wizard import college_list
+from mailer import MailQueue, MailWorker, RateLimitExceeded, SMTPSettings
+from tracing import REGISTRY, serve_metrics, span, traced
+from profiling import capture, list_profiles, note_inputs
+# reportlab (report.py), fpdf and python-docx are imported inside the
+# features that use them, so a cold start doesn't pay for them
+
+
+def result_frame(df, rows, cols):
+    # Gather just the displayed columns; the rest of the shared frame is never copied
+    return df.iloc[rows, df.columns.get_indexer(cols)]
+
+@traced("match_profiles")
+def match_profiles(ds, gpa, sat, act, eth, gen, ec_query, use_gpa=True, min_ec_score=0.0):
+    # Eth_norm, Gen_norm and acc_clean are precomputed by ingest.prepare_dataset
+    df = ds.frame
+    with span("match_profiles.filter") as s:
+        rows = profile_rows(ds, gpa, sat, act, eth, gen, use_gpa=use_gpa)
+        s.rows = len(rows)
+
+    ec_matches = [[] for _ in range(len(rows))]
     if ec_query.strip():
         keywords = extract_keywords(ec_query)
         if keywords:
-            def check_row(ec_text):
-                if pd.isna(ec_text):
-                    return False, []
-                ec_lower = ec_text.lower()
-                hits = [kw for kw in keywords if kw in ec_lower]
-                if len(keywords)>=2:
-                    return (len(hits)>=2, hits)
-                return (len(hits)>=1, hits)
-            mask = d['parsed_ECs'].apply(lambda txt: check_row(txt)[0])
-            d = d[mask].copy()
-            d['EC_matches'] = d['parsed_ECs'].apply(lambda txt: check_row(txt)[1])
-
-    return d[['url','GPA','SAT_Score','ACT_Score','Ethnicity','Gender','acc_clean','EC_matches']]
-
-def filter_by_colleges(df, colleges_input):
-    d = df[df['acc_clean'] != ""]
-    acc_col = d['acc_clean'].str.lower()
-
-    # Check for OR logic if " or " is present (case insensitive)
-    if " or " in colleges_input.lower():
-        cols = [c.strip().lower() for c in re.split(r"\s+or\s+", colleges_input, flags=re.IGNORECASE)]
-        pattern = "|".join([re.escape(c) for c in cols])
-        mask = acc_col.str.contains(pattern, na=False)
-    else:
-        # Default to AND logic using commas
-        cols = [c.strip().lower() for c in colleges_input.split(",") if c.strip()]
-        mask = acc_col.apply(lambda s: all(c in s for c in cols))
+            needed = 2 if len(set(keywords))>=2 else 1
+            with span("match_profiles.ec") as s:
+                rows, ec_matches, _ = ec_rows(ds, keywords, min_hits=needed, rows=rows, min_score=min_ec_score)
+                s.rows = len(rows)
+
+    d = result_frame(df, rows, ['url','GPA','SAT_Score','ACT_Score','Ethnicity','Gender','acc_clean'])
+    return d.assign(EC_matches=ec_matches)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _match_profiles_memo(version, gpa, sat, act, eth, gen, ec_keys, use_gpa, min_ec_score, _ds):
+    return match_profiles(_ds, gpa, sat, act, eth, gen, " ".join(ec_keys), use_gpa=use_gpa, min_ec_score=min_ec_score)
+
+def cached_match_profiles(ds, gpa, sat, act, eth, gen, ec_query, use_gpa=True, min_ec_score=0.0):
+    """match_profiles() memoized on the normalized filter tuple.
+
+    Reruns triggered by unrelated widgets, and repeated queries from any
+    session, are served from a bounded LRU instead of a new filter pass.
+    """
+    ec_keys = tuple(sorted(set(extract_keywords(ec_query))))
+    return _match_profiles_memo(
+        ds.version,
+        round(gpa, 2) if use_gpa and gpa is not None else None,
+        None if sat is None else int(sat),
+        None if act is None else int(act),
+        eth, gen, ec_keys, use_gpa, round(min_ec_score, 2), ds,
+    )
 
-    return d[mask][['url', 'GPA', 'SAT_Score', 'ACT_Score', 'Ethnicity', 'Gender', 'acc_clean', 'parsed_ECs']]
+@traced("match_twins")
+def match_twins(ds, gpa, sat, act, eth, gen, ec_query, k=25):
+    # Ranked by weighted distance instead of hard windows, nearest first
+    rows, distance, ec_matches = closest_twins(ds, gpa, sat, act, eth, gen, extract_keywords(ec_query), k=k)
+    d = result_frame(ds.frame, rows, ['url','GPA','SAT_Score','ACT_Score','Ethnicity','Gender','acc_clean'])
+    return d.assign(EC_matches=ec_matches, Distance=distance)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _match_twins_memo(version, gpa, sat, act, eth, gen, ec_keys, k, _ds):
+    return match_twins(_ds, gpa, sat, act, eth, gen, " ".join(ec_keys), k=k)
+
+def cached_match_twins(ds, gpa, sat, act, eth, gen, ec_query, k=25):
+    ec_keys = tuple(sorted(set(extract_keywords(ec_query))))
+    return _match_twins_memo(
+        ds.version,
+        None if gpa is None else round(gpa, 2),
+        None if sat is None else int(sat),
+        None if act is None else int(act),
+        eth, gen, ec_keys, k, ds,
+    )
 
-def load_data():
-    drive_url = "https://drive.google.com/uc?export=download&id=1nZtwYcUX_KraxOTAOLg6-ZvKZnKMNpSg"
-    try:
-        return pd.read_csv(drive_url)
-    except Exception as e:
-        st.warning(f"Could not load remote data from Google Drive, using local file. Error: {e}")
-        return pd.read_csv("master_data.csv")
-        
-def display_results(res):
+@traced("filter_by_colleges")
+def filter_by_colleges(ds, colleges_input):
+    # AND/OR/NOT are set operations on the college index's sorted row ids
+    rows = college_rows(ds, colleges_input)
+    return result_frame(ds.frame, rows, ['url', 'GPA', 'SAT_Score', 'ACT_Score', 'Ethnicity', 'Gender', 'acc_clean', 'parsed_ECs'])
+
+RESULTS_PER_PAGE = 25
+
+def display_results(res, key, query=()):
+    """Render one page of res; a different query (any repr-able inputs) starts again at page 1."""
     if res.empty:
         st.warning("0 matches found.")
-    else:
-        st.success(f"Found {len(res)} matching profiles:")
-        for _, r in res.iterrows():
-            ec_hits = r.get('EC_matches', [])
-            ec_line = f"<br><b>ECs in common:</b> {', '.join(ec_hits)}" if ec_hits else ""
-            st.markdown(f"""
-            <div style="font-size:14px; line-height:1.4; margin-bottom:8px;">
-              • <a href="{r['url']}" target="_blank">{r['url']}</a><br>
-              GPA: {r['GPA']:.2f} | SAT: {r['SAT_Score']} | ACT: {r['ACT_Score']}<br>
-              Ethnicity: {r['Ethnicity']} | Gender: {r['Gender']}<br>
-              Acceptances: {r['acc_clean']}{ec_line}
-            </div>
-            """, unsafe_allow_html=True)
+        return
+
+    total = len(res)
+    st.success(f"Found {total} matching profiles:")
+
+    # Only the visible page is formatted and sent to the browser
+    pages = ceil(total / RESULTS_PER_PAGE)
+    # A new widget key per query, so each result set opens on its first page
+    page_key = f"{key}_page_{hashlib.sha1(repr(query).encode()).hexdigest()[:12]}"
+    page = st.number_input(f"Page (of {pages})", 1, pages, key=page_key) if pages > 1 else 1
+    start = (page - 1) * RESULTS_PER_PAGE
+    shown = res.iloc[start:start + RESULTS_PER_PAGE]
+    with span("render_results") as s:
+        s.rows = len(shown)
+        st.markdown(_result_cards(shown), unsafe_allow_html=True)
+    if pages > 1:
+        st.caption(f"Showing {start + 1}–{start + len(shown)} of {total}")
+
+def _result_cards(shown):
+    cols = {c: shown[c].to_numpy() for c in ['url','GPA','SAT_Score','ACT_Score','Ethnicity','Gender','acc_clean']}
+    ec_col = shown['EC_matches'].to_numpy() if 'EC_matches' in shown else [[]] * len(shown)
+    dist_col = shown['Distance'].to_numpy() if 'Distance' in shown else None
+    cards = []
+    for i in range(len(shown)):
+        ec_hits = ec_col[i]
+        ec_line = f"<br><b>ECs in common:</b> {', '.join(ec_hits)}" if len(ec_hits) else ""
+        if dist_col is not None:
+            ec_line += f"<br><b>Twin distance:</b> {dist_col[i]:.2f}"
+        cards.append(f"""
+        <div style="font-size:14px; line-height:1.4; margin-bottom:8px;">
+          • <a href="{cols['url'][i]}" target="_blank">{cols['url'][i]}</a><br>
+          GPA: {cols['GPA'][i]:.2f} | SAT: {cols['SAT_Score'][i]} | ACT: {cols['ACT_Score'][i]}<br>
+          Ethnicity: {cols['Ethnicity'][i]} | Gender: {cols['Gender'][i]}<br>
+          Acceptances: {cols['acc_clean'][i]}{ec_line}
+        </div>
+        """)
+    return "".join(cards)
 
 # ——— New College List Wizard ———
 def is_valid_email(email):
-    return re.match(r"[^@]+@[^@]+\.[^@]+", email)
-
-def normalize_residency(residency):
-    if pd.isna(residency):
-        return "other"
-    r = residency.lower()
-    if "domestic" in r:
-        return "domestic"
-    if "international" in r:
-        return "international"
-    return "other"
+    return re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", email)
+
+@st.cache_resource
+def get_mail_worker():
+    """One delivery thread per server process, shared by every session."""
+    queue = MailQueue(os.path.join(CACHE_DIR, "mail_queue.sqlite3"))
+    return MailWorker(queue, SMTPSettings.from_secrets(st.secrets)).start()
 
 def fuzzy_match_major(user_major, majors_list, cutoff=0.6):
     if not user_major.strip():
@@ -185,19 +150,8 @@ def fuzzy_match_major(user_major, majors_list, cutoff=0.6):
     matches = get_close_matches(user_major.lower(), [m.lower() for m in majors_list], n=1, cutoff=cutoff)
     return matches[0] if matches else None
 
-from collections import Counter
-
-import smtplib
-from email.message import EmailMessage
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.utils import ImageReader
-from collections import Counter
-import re
-import pandas as pd
 
-def college_list_wizard(df):
+def college_list_wizard(ds):
     st.markdown("### 🎓 College List Wizard")
     st.info("Provide your academic profile and we’ll email you a personalized list of colleges!")
 
@@ -206,6 +160,10 @@ def college_list_wizard(df):
     test_score = st.text_input("Enter SAT (400–1600) or ACT (1–36):")
     major = st.text_input("Intended Major (please spell out full major, e.g., 'Computer Science'):")
     ecs = st.text_area("Describe your Extracurriculars:")
+    min_ec_score = st.slider(
+        "Minimum EC similarity", 0.0, 1.0, 0.0, 0.05,
+        help="Only base your list on profiles whose extracurriculars are at least this similar to yours (0 = any match).",
+    )
     domestic = st.checkbox("Domestic student? (leave unchecked for International)")
     email = st.text_input("Enter your Email:")
 
@@ -214,259 +172,39 @@ def college_list_wizard(df):
         st.warning("Please enter a valid email address.")
         return
 
-    # Parse GPA
-    try:
-        gpa_val = float(gpa)
-    except:
-        gpa_val = None
-
-    # Parse test score
-    sat_val = act_val = None
-    if test_score.strip().isdigit():
-        sc = int(test_score.strip())
-        if 1 <= sc <= 36:
-            act_val = sc
-            sat_val = sc * 45
-        elif 400 <= sc <= 1600:
-            sat_val = sc
-
-    # Match major
-    def match_major(user_major, majors_list):
-        user_major_lower = user_major.strip().lower()
-        for m in majors_list:
-            if user_major_lower in m.lower():
-                return m
-        return None
-
-    majors_list = df['Major'].dropna().unique()
-    matched_major = match_major(major, majors_list)
-
     if st.button("Match Me!", disabled=not is_valid_email(email)):
-        df2 = df.copy()
-
-        # Residency
-        df2['Residency_norm'] = df2['Residency'].apply(normalize_residency)
-        target_res = "domestic" if domestic else "international"
-        df2 = df2[df2['Residency_norm'] == target_res]
-
-        # GPA filter
-        if gpa_val is not None:
-            df2 = df2[(df2['GPA'] >= gpa_val - 0.1) & (df2['GPA'] <= gpa_val + 0.1)]
-
-        # SAT/ACT filter
-        def sat_act_match(row):
-            sat_ok = sat_val is not None and not pd.isna(row['SAT_Score']) and abs(row['SAT_Score'] - sat_val) <= 30
-            act_ok = act_val is not None and not pd.isna(row['ACT_Score']) and abs(row['ACT_Score'] - act_val) <= 1
-            conv_ok = act_val is not None and not pd.isna(row['SAT_Score']) and abs(row['SAT_Score'] - act_val*45) <= 30
-            return sat_ok or act_ok or conv_ok
-
-        if sat_val or act_val:
-            df2 = df2[df2.apply(sat_act_match, axis=1)]
-
-        # Major
-        if matched_major:
-            df2 = df2[df2['Major'] == matched_major]
-
-        # ECs
-        ec_keys = extract_keywords(ecs)
-        if ec_keys:
-            df2 = df2[df2['parsed_ECs'].apply(lambda txt: any(kw in str(txt).lower() for kw in ec_keys))]
-
-        # Extract clean college names
-        def extract_clean_colleges(raw):
-            if not isinstance(raw, str) or not raw.strip():
-                return []
-            parts = re.split(r"[\n,]+", raw)
-            indicators = [
-                "university", "college", "institute", "school",
-                "academy", "tech", "polytechnic", "poly", "mit",
-                "stanford", "harvard", "princeton", "yale"
-            ]
-            cleaned = []
-            for p in parts:
-                seg = p.strip()
-                if not seg:
-                    continue
-                name = seg.split("(", 1)[0].strip()
-                low = name.lower()
-                if any(ind in low for ind in indicators):
-                    cleaned.append(name[:100])
-            return cleaned
-
-        df2["cleaned_list"] = df2["acceptances"].apply(extract_clean_colleges)
-        all_schools = [school for sub in df2["cleaned_list"] for school in sub]
-        counts = Counter([s.lower() for s in all_schools])
+        note_inputs("college_list_wizard", gpa=gpa, test_score=test_score, major=major, ecs=ecs,
+                    min_ec_score=min_ec_score, domestic=domestic)
+        # Parsing, matching and aggregation live in wizard.py (shared with batch.py)
+        _, user_inputs, schools, profiles = college_list(
+            ds, gpa, test_score, major, ecs, domestic, email, min_ec_score=min_ec_score,
+        )
 
         # Build PDF
-        buffer = io.BytesIO()
-        c = canvas.Canvas(buffer, pagesize=letter)
-        width, height = letter
-
-        logo_path = "assets/logo.png"
-        logo_width = 100  # adjust width as needed
-        logo_height = 100  # adjust height as needed
-
-        # Draw logo at top right corner
-        # x position: page width - right margin - logo width
-        # y position: page height - top margin - logo height
-        right_margin = 40
-        top_margin = 50
-
-        c.drawImage(logo_path, width - right_margin - logo_width, height - top_margin - logo_height, 
-            width=logo_width, height=logo_height, mask='auto')
-
-        # Title and Timestamp
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(40, height - 50, "MatchMyApp - Personalized College List")
-        c.setFont("Helvetica", 10)
-        c.drawString(40, height - 70, "Generated on: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-        y = height - 100
-
-        # User inputs - including ECs
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, y, "📌 Your Inputs")
-        y -= 20
-        c.setFont("Helvetica", 10)
-
-        user_inputs = [
-            ("GPA", gpa),
-            ("SAT", str(sat_val) if sat_val else "N/A"),
-            ("ACT", str(act_val) if act_val else "N/A"),
-            ("Major", major if major else "N/A"),
-            ("Residency", "Domestic" if domestic else "International"),
-            ("Extracurriculars", ecs if ecs.strip() else "N/A"),
-            ("Email", email if email else "N/A"),
-        ]
-
-        for label, value in user_inputs:
-            lines = textwrap.wrap(f"{label}: {value}", width=90)
-            for line in lines:
-                c.drawString(50, y, line)
-                y -= 15
-
-        # Space after inputs
-        y -= 20
-        
-        # Matched Colleges (up to 20)
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, y, "🎯 Matched Colleges")
-        y -= 25
-        
-        c.setFont("Helvetica-Bold", 11)
-        max_colleges = 10
-        for school, cnt in counts.most_common(max_colleges):
-            college_name = school.title()
-            text = f"{college_name} — {cnt} acceptance(s)"
-            c.setFillColorRGB(0, 0, 0.5)  # dark blue
-            c.setFont("Helvetica-Bold", 12)
-            c.drawString(50, y, college_name)
-        
-            c.setFillColorRGB(0, 0, 0)
-            c.setFont("Helvetica", 11)
-            accept_text = f" — {cnt} acceptance(s)"
-            width_name = c.stringWidth(college_name, "Helvetica-Bold", 12)
-            c.drawString(50 + width_name, y, accept_text)
-        
-            url = next((r['url'] for _, r in df2.iterrows() if school in str(r['acceptances']).lower()), None)
-            if url:
-                y -= 15
-                c.setFont("Helvetica-Oblique", 9)
-                c.setFillColorRGB(0, 0, 1)  # blue for link
-                c.drawString(60, y, "Reddit: " + url)
-                c.linkURL(url, (60, y - 2, 60 + c.stringWidth("Reddit: " + url, "Helvetica-Oblique", 9), y + 10), relative=0)
-        
-            y -= 25
-            c.setFillColorRGB(0, 0, 0)
-        
-            if y < 80:
-                c.showPage()
-                y = height - 50
-        
-        # Reddit Insights — only filtered posts, max 10
-        y -= 10
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, y, "🧠 Profiles Like Yours")
-        y -= 25
-        c.setFont("Helvetica", 9)
-        
-        reddit_filtered = df2.head(10)  # assuming df2 already filtered
-        
-        if reddit_filtered.empty:
-            c.drawString(50, y, "No Reddit posts available after applying your filters.")
-            y -= 20
-        else:
-            for _, row in reddit_filtered.iterrows():
-                url = row['url']
-                gpa_post = row.get('GPA', None)
-                sat_post = row.get('SAT_Score', None)
-                act_post = row.get('ACT_Score', None)
-                major_post = row.get('Major', None)
-                text = f"GPA {gpa_post}, SAT {sat_post}, ACT {act_post}, Major {major_post}"
-        
-                c.setFillColorRGB(0, 0, 1)
-                c.drawString(50, y, url)
-                c.linkURL(url, (50, y - 2, 50 + c.stringWidth(url, "Helvetica", 9), y + 10), relative=0)
-                y -= 12
-        
-                c.setFillColorRGB(0, 0, 0)
-                for line in textwrap.wrap(text, width=110):
-                    c.drawString(50, y, line)
-                    y -= 12
-        
-                y -= 15
-                if y < 80:
-                    c.showPage()
-                    y = height - 50
-                    c.setFont("Helvetica", 9)
-        
-        # Notes Section with your exact text
-        y -= 10
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(40, y, "💡 Notes")
-        y -= 25
-        c.setFont("Helvetica", 11)
-        
-        notes = """
-        These colleges were suggested to you because past applicants with similar profiles and interests got into them. When building your college list, please make sure to consider a range of factors, including your class size preferences, location, campus culture, sports culture, and financial aid.
-        
-        Also, note that most of the top schools are committed to meeting your full demonstrated need, but do your research since there are a few exceptions! 
-        
-        If you found this helpful, do share our app with a friend to spread the joy of college application preparation!
-        """
-        
-        for line in notes.strip().split('\n'):
-            for wrapped_line in textwrap.wrap(line.strip(), width=110):
-                c.drawString(50, y, wrapped_line)
-                y -= 15
-            y -= 5
-        
-        c.save()
-        buffer.seek(0)
-
-
-
-        # Email PDF
-        try:
-            msg = EmailMessage()
-            msg["Subject"] = "Your MatchMyApp Personalized College List"
-            msg["From"] = st.secrets["EMAIL_ADDRESS"]
-            msg["To"] = email
-            msg.set_content("Attached is your personalized list of colleges based on your inputs. Good luck!")
+        with span("wizard.render_pdf"):
+            from report import render_college_list
+            pdf_bytes = render_college_list(user_inputs, schools, profiles)
 
-            msg.add_attachment(buffer.read(), maintype="application", subtype="pdf", filename="college_list.pdf")
-
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-                smtp.login(st.secrets["EMAIL_ADDRESS"], st.secrets["EMAIL_APP_PASSWORD"])
-                smtp.send_message(msg)
-
-            st.success("✅ PDF sent to your email! If it’s playing hide and seek, check your Spam folder just in case. ")
+        # Queue the PDF; the background worker handles SMTP and retries
+        try:
+            with span("wizard.enqueue"):
+                get_mail_worker().enqueue(
+                    email,
+                    "Your MatchMyApp Personalized College List",
+                    "Attached is your personalized list of colleges based on your inputs. Good luck!",
+                    attachment=pdf_bytes,
+                    filename="college_list.pdf",
+                )
+            st.success("✅ Your PDF is on its way! If it’s playing hide and seek, check your Spam folder just in case. ")
+        except RateLimitExceeded:
+            st.warning("We’ve already sent several lists to this address recently. Please try again later.")
         except Exception as e:
             st.error(f"❌ Failed to send email: {e}")
 
 
 
 
+@traced("timeline")
 def generate_and_render_timeline(num_early, num_rd, num_ed2, start_date, fafsa_eligible):
     timeline = []
     # Normalize start_date to datetime with time 00:00 if only date provided
@@ -562,6 +300,7 @@ def generate_and_render_timeline(num_early, num_rd, num_ed2, start_date, fafsa_e
 
 # ----------- PDF generation -------------
 
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -603,8 +342,6 @@ def generate_and_render_timeline(num_early, num_rd, num_ed2, start_date, fafsa_e
 
 
 
-import re
-from collections import Counter
 
 theme_advice = {
     "belonging": "Talk about communities or spaces where you feel most at home. Think culture, clubs, religion, identity — anything that gives you a sense of place.",
@@ -689,7 +426,9 @@ The prompt is nudging you to *{', '.join(verbs)}*. Let that guide your structure
     return output.strip()
 
 
+@traced("create_docx")
 def create_docx(prompt_text, essay_text):
+    from docx import Document
     doc = Document()
     doc.add_heading("Essay Prompt", level=1)
     doc.add_paragraph(prompt_text)
@@ -700,11 +439,107 @@ def create_docx(prompt_text, essay_text):
     doc.add_paragraph(essay_text)
 
     # Save to in-memory bytes buffer
-    buffer = BytesIO()
+    buffer = io.BytesIO()
     doc.save(buffer)
     buffer.seek(0)
     return buffer
 
+# ——— Admin: Latency Metrics ———
+@st.cache_resource
+def start_metrics_server():
+    """Serve /metrics for Prometheus when MATCHMYAPP_METRICS_PORT is set."""
+    port = os.environ.get("MATCHMYAPP_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return serve_metrics(int(port), host=os.environ.get("MATCHMYAPP_METRICS_HOST", "127.0.0.1"))
+    except OSError:
+        return None  # another server process already holds the port
+
+def admin_enabled():
+    """Admin tools are opt-in: MATCHMYAPP_ADMIN=1, or ?admin=<ADMIN_TOKEN secret>."""
+    if os.environ.get("MATCHMYAPP_ADMIN") == "1":
+        return True
+    token = st.query_params.get("admin")
+    if not token:
+        return False
+    try:
+        return token == st.secrets.get("ADMIN_TOKEN")
+    except FileNotFoundError:
+        return False
+
+def admin_panel(ds):
+    with st.sidebar.expander("📈 Stage latency", expanded=False):
+        stages = REGISTRY.summary()
+        if not stages:
+            st.caption("No spans recorded yet in this server process.")
+        else:
+            st.dataframe(
+                [{k: v for k, v in s.items() if k not in ("total_ms",)} for s in stages],
+                hide_index=True, use_container_width=True,
+                column_config={k: st.column_config.NumberColumn(format="%.1f")
+                               for k in ("mean_ms", "p50_ms", "p95_ms", "max_ms", "mean_rows")},
+            )
+            st.caption("p50/p95 are estimated from histogram buckets.")
+        json_col, prom_col = st.columns(2)
+        json_col.download_button("JSON", REGISTRY.to_json(), "metrics.json", "application/json")
+        prom_col.download_button("Prometheus", REGISTRY.to_prometheus(), "metrics.txt", "text/plain")
+        if st.button("Reset metrics"):
+            REGISTRY.reset()
+            st.rerun()
+
+    with st.sidebar.expander("🔬 Profiles", expanded=False):
+        if st.button("Profile the next rerun"):
+            st.session_state["profile_next_run"] = True
+        st.caption("Or add `profile=1` to the URL. Captures are kept in the cache directory.")
+        for meta in list_profiles(PROFILE_DIR)[:10]:
+            sections = ", ".join(meta["inputs"]) or "no inputs"
+            st.markdown(f"**{meta['id']}** — {meta['seconds']:.2f} s ({sections})")
+            offer_profile_downloads(meta["id"], meta["paths"])
+
+    with st.sidebar.expander("💾 Dataset memory", expanded=False):
+        report = ds.memory_report()
+        st.metric("Bytes per profile", f"{report.loc['total', 'per_profile']:,.0f}",
+                  help=f"{len(ds):,} profiles, {report.loc['total', 'bytes'] / 2**20:,.1f} MiB shared by every session")
+        st.dataframe(report.style.format("{:,.0f}"), use_container_width=True)
+        shared = shared_generation()
+        if shared:
+            st.caption(f"Memory-mapped from shared generation {shared['generation']}, "
+                       f"published {datetime.fromtimestamp(shared['published_at']):%Y-%m-%d %H:%M}; "
+                       "its pages are shared by every server process.")
+
+# ——— Admin: Profiling ———
+# A capture wraps one whole rerun in cProfile; when none is requested the
+# only cost is the check in profile_requested()
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+def profile_requested():
+    if st.session_state.pop("profile_next_run", False):
+        return True
+    return st.query_params.get("profile") == "1" and admin_enabled()
+
+def offer_profile_downloads(profile_id, paths):
+    cols = st.columns(3)
+    for col, (ext, mime) in zip(cols, (("prof", "application/octet-stream"), ("html", "text/html"), ("json", "application/json"))):
+        if ext in paths:
+            with open(paths[ext], "rb") as f:
+                col.download_button(f".{ext}", f.read(), f"{profile_id}.{ext}", mime, key=f"{profile_id}_{ext}")
+
+def run():
+    if not profile_requested():
+        main()
+        return
+    # One rerun only: drop the URL flag so the next interaction runs normally
+    st.query_params.pop("profile", None)
+    with capture(PROFILE_DIR, label="app.py rerun") as cap:
+        main()
+    if cap is None:
+        st.sidebar.warning("Another session is being profiled; this rerun was not captured.")
+    else:
+        with st.sidebar.expander("🔬 Profile captured", expanded=True):
+            st.markdown(f"**{cap.id}** — {cap.seconds:.2f} s")
+            offer_profile_downloads(cap.id, cap.paths)
+
 # ——— Main App ———
 def main():
     st.markdown("""
@@ -755,7 +590,10 @@ def main():
 
 
 
-    df = load_data()
+    if st.sidebar.button("🔄 Refresh data"):
+        refresh_data()
+    ds = load_dataset()
+    start_metrics_server()
     st.markdown("""
     <style>
     /* For the tab labels */
@@ -770,50 +608,79 @@ def main():
 
     with tabs[0]:
         st.markdown("#### Enter your profile (leave filters blank to skip):")
+        live = st.toggle("Update results as I change filters", value=False)
+        mode = st.radio(
+            "Match mode", ["Exact ranges", "Closest twins"], horizontal=True,
+            help="Exact ranges: ±0.05 GPA, ±30 SAT, ±1 ACT. Closest twins: the most similar profiles, ranked.",
+        )
         use_gpa = st.checkbox("Filter by GPA", value=True)
-        if use_gpa:
-            gpa_s = st.slider("GPA (max 4.0)", 0.0, 4.0, 4.0, 0.01)
-            gpa_m = st.number_input("Or enter GPA manually", 0.0, 4.0, gpa_s, 0.01)
-            user_gpa = gpa_m if gpa_m != gpa_s else gpa_s
-        else:
-            user_gpa = None
-
         score_choice = st.selectbox("Score filter", ["No filter","SAT","ACT"])
-        user_sat = user_act = None
-        if score_choice=="SAT":
-            user_sat = st.number_input("SAT Score",400,1600,1580,10)
-        elif score_choice=="ACT":
-            user_act = st.number_input("ACT Score",1,36,35,1)
-
-        user_eth = st.selectbox(
-            "Ethnicity",
-            ["No filter","Asian","White","Black","Hispanic","Native American","Middle Eastern","Other"],
-        )
-        user_gen = st.selectbox("Gender", ["No filter","Male","Female"])
-        ec_query = st.text_area(
-            "Describe your extracurriculars:",
-            placeholder="e.g., robotics club, varsity soccer, volunteer tutoring",
-            height=80,
-        )
 
-        res = match_profiles(
-            df, user_gpa, user_sat, user_act,
-            user_eth, user_gen, ec_query,
-            use_gpa=use_gpa
-        )
-        display_results(res)
+        # In submit mode the inputs sit in a form, so dragging the GPA slider
+        # doesn't rerun the script (or the query) for every intermediate value
+        with (st.container() if live else st.form("profile_filter_form")):
+            if use_gpa:
+                gpa_s = st.slider("GPA (max 4.0)", 0.0, 4.0, 4.0, 0.01)
+                gpa_m = st.number_input("Or enter GPA manually", 0.0, 4.0, gpa_s, 0.01)
+                user_gpa = gpa_m if gpa_m != gpa_s else gpa_s
+            else:
+                user_gpa = None
+
+            user_sat = user_act = None
+            if score_choice=="SAT":
+                user_sat = st.number_input("SAT Score",400,1600,1580,10)
+            elif score_choice=="ACT":
+                user_act = st.number_input("ACT Score",1,36,35,1)
+
+            user_eth = st.selectbox(
+                "Ethnicity",
+                ["No filter","Asian","White","Black","Hispanic","Native American","Middle Eastern","Other"],
+            )
+            user_gen = st.selectbox("Gender", ["No filter","Male","Female"])
+            ec_query = st.text_area(
+                "Describe your extracurriculars:",
+                placeholder="e.g., robotics club, varsity soccer, volunteer tutoring",
+                height=80,
+            )
+            if mode == "Closest twins":
+                num_twins = st.slider("Number of twins", 5, 100, 25, 5)
+            else:
+                min_ec_score = st.slider(
+                    "Minimum EC similarity", 0.0, 1.0, 0.0, 0.05,
+                    help="Only show profiles whose extracurriculars are at least this similar to yours (0 = any match).",
+                )
+            if not live:
+                st.form_submit_button("Find matches")
+
+        note_inputs("profile_filter", mode=mode, gpa=user_gpa, sat=user_sat, act=user_act,
+                    ethnicity=user_eth, gender=user_gen, ec_query=ec_query, use_gpa=use_gpa,
+                    min_ec_score=None if mode == "Closest twins" else min_ec_score)
+        if mode == "Closest twins":
+            res = cached_match_twins(ds, user_gpa, user_sat, user_act, user_eth, user_gen, ec_query, k=num_twins)
+        else:
+            res = cached_match_profiles(
+                ds, user_gpa, user_sat, user_act,
+                user_eth, user_gen, ec_query,
+                use_gpa=use_gpa, min_ec_score=min_ec_score,
+            )
+        display_results(res, key="profile_results", query=(
+            ds.version, mode, user_gpa, user_sat, user_act, user_eth, user_gen, ec_query, use_gpa,
+            num_twins if mode == "Closest twins" else min_ec_score,
+        ))
 
     with tabs[1]:
         st.markdown("#### Filter profiles accepted to the following college(s):")
         college_input = st.text_input("Enter college name(s), comma‑separated. Use keyword OR to get profiles that were accepted to at-least one of the chosen colleges!")
+        st.caption("Put NOT in front of a college to exclude profiles accepted there, e.g. `MIT, NOT Stanford`.")
         if college_input.strip():
-            res = filter_by_colleges(df, college_input)
-            display_results(res)
+            note_inputs("college_filter", colleges=college_input)
+            res = filter_by_colleges(ds, college_input)
+            display_results(res, key="college_results", query=(ds.version, college_input))
         else:
             st.info("Enter one or more college names to see matching acceptances.")
 
     with tabs[2]:
-        college_list_wizard(df)
+        college_list_wizard(ds)
 
     with tabs[3]:
         st.markdown("### College Application Timeline Planner")
@@ -827,6 +694,7 @@ def main():
             submitted = st.form_submit_button("Generate Timeline")
 
         if submitted:
+            note_inputs("timeline", early=num_early, rd=num_rd, ed2=num_ed2, start=start_date, fafsa=fafsa_eligible)
             generate_and_render_timeline(num_early, num_rd, num_ed2, start_date, fafsa_eligible)
 
     with tabs[4]:
@@ -884,7 +752,11 @@ def main():
                         file_name="essay_with_breakdown.docx",
                         mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
                     )
+
+    # Last, so the table includes this run's spans
+    if admin_enabled():
+        admin_panel(ds)
                                     
 
 if __name__ == "__main__":
-    main()
+    run()
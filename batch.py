@@ -0,0 +1,152 @@
+"""Generate College List Wizard PDFs for a whole class from a CSV.
+
+Each row of the input CSV is one student. Recognized columns (any case,
+all optional): name, gpa, test_score (SAT or ACT, as in the wizard),
+major, extracurriculars, domestic (yes/no), email. Writes one PDF per
+student plus summary.csv to the output directory.
+
+    python batch.py students.csv --out lists/ --workers 8
+
+The dataset is prepared and indexed once, published to a temporary
+shared store (see shared_store.py) and memory-mapped by every worker.
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import shared_store
+from dataset import INDEXES, Dataset
+from ingest import prepare_dataset, read_snapshot
+
+
+STUDENT_COLUMNS = ("name", "gpa", "test_score", "major", "extracurriculars", "domestic", "email")
+SUMMARY_COLUMNS = ("row", "name", "pdf", "matched_profiles", "top_schools", "seconds", "error")
+TRUTHY = {"1", "true", "yes", "y", "domestic"}
+
+
+def read_students(path):
+    """One dict per row with every STUDENT_COLUMNS key, values as typed (strings)."""
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+    raw.columns = [c.strip().lower().replace(" ", "_") for c in raw.columns]
+    students = []
+    for record in raw.to_dict("records"):
+        student = {col: str(record.get(col, "")).strip() for col in STUDENT_COLUMNS}
+        student["domestic"] = student["domestic"].lower() in TRUTHY
+        students.append(student)
+    return students
+
+
+def open_dataset(path):
+    """An indexed Dataset from a raw CSV (same schema as master_data.csv) or a prepared .arrow snapshot."""
+    if path.endswith(".arrow"):
+        ds = Dataset(read_snapshot(path), os.path.basename(path))
+    else:
+        ds = Dataset(prepare_dataset(pd.read_csv(path)), os.path.basename(path))
+    for name in INDEXES:
+        getattr(ds, name)
+    return ds
+
+
+def _pdf_name(row, name):
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")[:60]
+    return f"{row:04d}-{slug or 'student'}.pdf"
+
+
+# ——— Workers ———
+# Set once per worker process by _attach()
+_ds = None
+
+
+def _attach(store, meta):
+    global _ds
+    _ds = shared_store.attach(store, meta)
+
+
+def _run_student(task):
+    from report import render_college_list
+    from wizard import college_list
+
+    row, student, out_dir = task
+    summary = {"row": row, "name": student["name"], "pdf": "", "matched_profiles": 0,
+               "top_schools": "", "seconds": 0.0, "error": ""}
+    start = time.perf_counter()
+    try:
+        rows, inputs, schools, profiles = college_list(
+            _ds, student["gpa"], student["test_score"], student["major"],
+            student["extracurriculars"], student["domestic"], student["email"],
+        )
+        pdf = os.path.join(out_dir, _pdf_name(row, student["name"]))
+        with open(pdf, "wb") as f:
+            f.write(render_college_list(inputs, schools, profiles))
+        summary.update(
+            pdf=os.path.basename(pdf),
+            matched_profiles=len(rows),
+            top_schools="; ".join(f"{name} ({count})" for name, count, _ in schools),
+        )
+    except Exception as e:  # one bad row shouldn't sink the whole class
+        summary["error"] = f"{type(e).__name__}: {e}"
+    summary["seconds"] = round(time.perf_counter() - start, 4)
+    return summary
+
+
+def run(students, ds, out_dir, workers=None):
+    """Process students over a pool of workers; returns summaries in input order."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(students) // (workers * 8))
+    with tempfile.TemporaryDirectory(prefix="matchmyapp-batch-") as store:
+        meta = shared_store.publish(store, ds)
+        tasks = [(i + 1, student, out_dir) for i, student in enumerate(students)]
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(store, meta)) as pool:
+            return list(pool.map(_run_student, tasks, chunksize=chunksize))
+
+
+def write_summary(summaries, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def main():
+    from data_loader import CACHE_DIR, CSV_NAME, LOCAL_FALLBACK
+
+    default_data = os.path.join(CACHE_DIR, CSV_NAME)
+    if not os.path.exists(default_data):
+        default_data = LOCAL_FALLBACK
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("students", help="CSV of student profiles, one per row")
+    parser.add_argument("--out", default="college_lists", help="directory for the PDFs and summary.csv")
+    parser.add_argument("--data", default=default_data,
+                        help="dataset CSV or prepared .arrow snapshot (default: the app's local copy)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    students = read_students(args.students)
+    start = time.perf_counter()
+    ds = open_dataset(args.data)
+    loaded = time.perf_counter()
+    summaries = run(students, ds, args.out, args.workers)
+    done = time.perf_counter()
+
+    summary_path = os.path.join(args.out, "summary.csv")
+    write_summary(summaries, summary_path)
+    failed = sum(1 for s in summaries if s["error"])
+    elapsed = done - loaded
+    print(f"{len(summaries) - failed} PDFs written to {args.out}, {failed} failed; summary in {summary_path}")
+    print(f"{len(summaries) / elapsed:,.1f} profiles/s over {elapsed:.2f} s "
+          f"(plus {loaded - start:.2f} s loading {len(ds):,} dataset profiles)")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
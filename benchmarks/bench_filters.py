@@ -0,0 +1,89 @@
+"""Per-query time of the numeric filters at several dataset sizes.
+
+The vectorized and indexed columns time row selection only; the legacy
+column is the old row-wise code, which materializes frames as it goes.
+
+    python -m benchmarks.bench_filters --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_dataset
+from dataset import Dataset
+from filters import profile_mask, profile_rows, wizard_mask, wizard_rows
+
+
+def _legacy_profile(df, gpa, sat, eth):
+    # The pre-vectorization match_profiles() numeric filters, kept for comparison
+    d = df[df['acc_clean'] != ""].copy()
+    if eth != "No filter":
+        d = d[d['Eth_norm'] == eth.lower()]
+    d = d[(d['GPA'] >= gpa - 0.05) & (d['GPA'] <= gpa + 0.05)]
+    return d[d['SAT_Score'].apply(lambda x: abs(x - sat) <= 30 if not pd.isna(x) else False)]
+
+
+def _legacy_wizard(df, gpa, act):
+    sat = act * 45
+    df2 = df.copy()
+    df2 = df2[df2['Residency_norm'] == "domestic"]
+    df2 = df2[(df2['GPA'] >= gpa - 0.1) & (df2['GPA'] <= gpa + 0.1)]
+
+    def sat_act_match(row):
+        sat_ok = not pd.isna(row['SAT_Score']) and abs(row['SAT_Score'] - sat) <= 30
+        act_ok = not pd.isna(row['ACT_Score']) and abs(row['ACT_Score'] - act) <= 1
+        return sat_ok or act_ok
+
+    return df2[df2.apply(sat_act_match, axis=1)]
+
+
+def time_query(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="skip the row-wise baseline above this many profiles")
+    args = parser.parse_args()
+
+    print(f"{'profiles':>10} {'query':<8} {'vectorized ms':>14} {'indexed ms':>11} {'legacy ms':>10} {'matches':>8}")
+    for n in args.sizes:
+        df = synthetic_dataset(n)
+        ds = Dataset(df, "bench")
+        ds.score_index  # built once per dataset version, not per query
+        queries = {
+            "profile": (
+                lambda: np.flatnonzero(profile_mask(df, 3.9, 1500, None, "Asian", "No filter")),
+                lambda: profile_rows(ds, 3.9, 1500, None, "Asian", "No filter"),
+                lambda: _legacy_profile(df, 3.9, 1500, "Asian"),
+            ),
+            "wizard": (
+                lambda: np.flatnonzero(wizard_mask(df, 3.9, 34 * 45, 34, "domestic")),
+                lambda: wizard_rows(ds, 3.9, 34 * 45, 34, "domestic"),
+                lambda: _legacy_wizard(df, 3.9, 34),
+            ),
+        }
+        queries["narrow"] = (
+            lambda: np.flatnonzero(profile_mask(df, 3.2, 1250, None, "No filter", "No filter")),
+            lambda: profile_rows(ds, 3.2, 1250, None, "No filter", "No filter"),
+            lambda: _legacy_profile(df, 3.2, 1250, "No filter"),
+        )
+        for name, (fast, indexed, legacy) in queries.items():
+            fast_ms = time_query(fast, args.repeat) * 1000
+            indexed_ms = time_query(indexed, args.repeat) * 1000
+            legacy_ms = f"{time_query(legacy, 1) * 1000:10.1f}" if n <= args.legacy_max else f"{'-':>10}"
+            print(f"{n:>10} {name:<8} {fast_ms:>14.2f} {indexed_ms:>11.2f} {legacy_ms} {len(indexed()):>8}")
+
+
+if __name__ == "__main__":
+    main()
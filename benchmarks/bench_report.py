@@ -0,0 +1,201 @@
+"""College List Wizard PDFs per second on one core.
+
+The baseline column runs the drawing code of the old inline renderer in
+college_list_wizard(), copied from the baseline app.py with reportlab's
+default settings. Only its data lookups (the Counter of schools and the
+iterrows() search for each example URL) are replaced by the same payload
+the current renderer gets, so the comparison covers PDF drawing alone and,
+if anything, understates the old per-request cost.
+
+    python -m benchmarks.bench_report --seconds 5
+"""
+import argparse
+import io
+import os
+import textwrap
+import time
+from datetime import datetime
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from benchmarks.synthetic import synthetic_dataset
+from report import render_college_list
+from wizard import aggregate_schools
+
+
+BASELINE_LOGO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "logo.png")
+
+
+def _baseline_render(inputs, schools, profiles):
+    # The old renderer ran with reportlab's default ASCII85 streams
+    use_a85, rl_config.useA85 = rl_config.useA85, 1
+    try:
+        return _baseline_canvas(inputs, schools, profiles)
+    finally:
+        rl_config.useA85 = use_a85
+
+
+def _baseline_canvas(user_inputs, schools, profiles):
+    # Baseline app.py college_list_wizard(), "# Build PDF" through c.save()
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    logo_path = BASELINE_LOGO
+    logo_width = 100
+    logo_height = 100
+    right_margin = 40
+    top_margin = 50
+
+    c.drawImage(logo_path, width - right_margin - logo_width, height - top_margin - logo_height,
+        width=logo_width, height=logo_height, mask='auto')
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(40, height - 50, "MatchMyApp - Personalized College List")
+    c.setFont("Helvetica", 10)
+    c.drawString(40, height - 70, "Generated on: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+    y = height - 100
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "📌 Your Inputs")
+    y -= 20
+    c.setFont("Helvetica", 10)
+
+    for label, value in user_inputs:
+        lines = textwrap.wrap(f"{label}: {value}", width=90)
+        for line in lines:
+            c.drawString(50, y, line)
+            y -= 15
+
+    y -= 20
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "🎯 Matched Colleges")
+    y -= 25
+
+    c.setFont("Helvetica-Bold", 11)
+    for school, cnt, urls in schools:  # was counts.most_common(max_colleges)
+        college_name = school.title()
+        c.setFillColorRGB(0, 0, 0.5)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(50, y, college_name)
+
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont("Helvetica", 11)
+        accept_text = f" — {cnt} acceptance(s)"
+        width_name = c.stringWidth(college_name, "Helvetica-Bold", 12)
+        c.drawString(50 + width_name, y, accept_text)
+
+        url = urls[0] if urls else None  # was an iterrows() search of df2
+        if url:
+            y -= 15
+            c.setFont("Helvetica-Oblique", 9)
+            c.setFillColorRGB(0, 0, 1)
+            c.drawString(60, y, "Reddit: " + url)
+            c.linkURL(url, (60, y - 2, 60 + c.stringWidth("Reddit: " + url, "Helvetica-Oblique", 9), y + 10), relative=0)
+
+        y -= 25
+        c.setFillColorRGB(0, 0, 0)
+
+        if y < 80:
+            c.showPage()
+            y = height - 50
+
+    y -= 10
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "🧠 Profiles Like Yours")
+    y -= 25
+    c.setFont("Helvetica", 9)
+
+    if not profiles:  # was reddit_filtered.empty
+        c.drawString(50, y, "No Reddit posts available after applying your filters.")
+        y -= 20
+    else:
+        for url, text in profiles:  # was df2.head(10).iterrows()
+            c.setFillColorRGB(0, 0, 1)
+            c.drawString(50, y, url)
+            c.linkURL(url, (50, y - 2, 50 + c.stringWidth(url, "Helvetica", 9), y + 10), relative=0)
+            y -= 12
+
+            c.setFillColorRGB(0, 0, 0)
+            for line in textwrap.wrap(text, width=110):
+                c.drawString(50, y, line)
+                y -= 12
+
+            y -= 15
+            if y < 80:
+                c.showPage()
+                y = height - 50
+                c.setFont("Helvetica", 9)
+
+    y -= 10
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "💡 Notes")
+    y -= 25
+    c.setFont("Helvetica", 11)
+
+    notes = """
+    These colleges were suggested to you because past applicants with similar profiles and interests got into them. When building your college list, please make sure to consider a range of factors, including your class size preferences, location, campus culture, sports culture, and financial aid.
+
+    Also, note that most of the top schools are committed to meeting your full demonstrated need, but do your research since there are a few exceptions!
+
+    If you found this helpful, do share our app with a friend to spread the joy of college application preparation!
+    """
+
+    for line in notes.strip().split('\n'):
+        for wrapped_line in textwrap.wrap(line.strip(), width=110):
+            c.drawString(50, y, wrapped_line)
+            y -= 15
+        y -= 5
+
+    c.save()
+    return buffer.getvalue()
+
+
+def report_inputs(df):
+    """A realistic wizard payload: the first 500 profiles stand in for the matches."""
+    matches = df.head(500)
+    counts, examples = aggregate_schools(df, range(500), 3.9, 1520)
+    inputs = [
+        ("GPA", "3.9"), ("SAT", "1520"), ("ACT", "N/A"), ("Major", "Computer Science"),
+        ("Residency", "Domestic"), ("Extracurriculars", "robotics captain, math olympiad, research internship " * 3),
+        ("Email", "student@example.com"),
+    ]
+    schools = [(school, cnt, examples[school]) for school, cnt in counts.most_common(10)]
+    profiles = [
+        (url, f"GPA {gpa}, SAT {sat}, ACT {act}, Major {major}")
+        for url, gpa, sat, act, major in zip(
+            matches['url'][:10], matches['GPA'], matches['SAT_Score'], matches['ACT_Score'], matches['Major'])
+    ]
+    return inputs, schools, profiles
+
+
+def pdfs_per_second(fn, seconds):
+    fn()  # warm caches (fonts, the decoded logo)
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        fn()
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="time budget per renderer")
+    args = parser.parse_args()
+
+    payload = report_inputs(synthetic_dataset(2_000))
+    size = len(render_college_list(*payload))
+    cached = pdfs_per_second(lambda: render_college_list(*payload), args.seconds)
+    baseline = pdfs_per_second(lambda: _baseline_render(*payload), args.seconds)
+    print(f"{'renderer':<10} {'PDFs/s':>8} {'ms/PDF':>8}")
+    print(f"{'cached':<10} {cached:>8.1f} {1000 / cached:>8.2f}")
+    print(f"{'baseline':<10} {baseline:>8.1f} {1000 / baseline:>8.2f}")
+    print(f"report size: {size / 1024:.1f} KiB, speedup {cached / baseline:.1f}x (drawing only)")
+
+
+if __name__ == "__main__":
+    main()
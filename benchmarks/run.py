@@ -0,0 +1,146 @@
+"""Time every query path on synthetic datasets and write the results as JSON.
+
+Each size gets a fresh synthetic dataset (benchmarks.synthetic). Index
+builds and ingest are timed once; queries report the median of --repeat
+runs. Pass --compare with an earlier JSON file to print the ratio against
+it, e.g. one produced on the previous commit.
+
+    python -m benchmarks.run --sizes 10000 100000 --out bench.json
+    python -m benchmarks.run --sizes 10000 100000 --compare bench.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_filters import time_query
+from benchmarks.bench_report import report_inputs
+from benchmarks.synthetic import synthetic_raw
+from dataset import INDEXES, Dataset
+from ingest import prepare_dataset
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    import app  # query functions only; the Streamlit script runs under __main__
+
+from aggregates import race_aggregates, school_points, school_stats
+from neighbors import closest_twins
+from report import render_college_list
+from wizard import college_list
+
+
+# ——— Query Paths ———
+# name -> fn(ds) returning something with a length (rows or bytes matched)
+def _wizard(ds):
+    _, _, schools, _ = college_list(ds, "3.9", "1500", "Computer Science", "robotics, research", True)
+    return schools
+
+
+def _fun_data_corner(ds):
+    race_aggregates(ds.frame)
+    school_points(ds, "Harvard University")
+    return school_stats(ds)
+
+
+QUERIES = {
+    "match_profiles": lambda ds: app.match_profiles(ds, 3.9, 1500, None, "Asian", "No filter", ""),
+    "match_profiles_ec": lambda ds: app.match_profiles(
+        ds, 3.9, 1500, None, "No filter", "No filter", "robotics club president, math olympiad"),
+    "closest_twins": lambda ds: closest_twins(ds, 3.9, 1500, None, "Asian", "Male", ["robotics"], k=25)[0],
+    "filter_by_colleges": lambda ds: app.filter_by_colleges(ds, "MIT, UPenn, NOT Stanford"),
+    "filter_by_colleges_or": lambda ds: app.filter_by_colleges(ds, "Harvard or Yale or Princeton"),
+    "wizard": _wizard,
+    "fun_data_corner": _fun_data_corner,
+}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_size(n, repeat, seed=0):
+    results = []
+    raw = synthetic_raw(n, seed)
+    df, ms = _timed(lambda: prepare_dataset(raw))
+    results.append({"size": n, "bench": "ingest.prepare_dataset", "ms": ms, "rows": len(df)})
+
+    ds = Dataset(df, f"bench-{n}")
+    for name in INDEXES:
+        _, ms = _timed(lambda: getattr(ds, name))
+        results.append({"size": n, "bench": f"build.{name}", "ms": ms, "rows": n})
+
+    for name, query in QUERIES.items():
+        matched = len(query(ds))  # warm-up; also the reported result size
+        ms = time_query(lambda: query(ds), repeat) * 1000
+        results.append({"size": n, "bench": name, "ms": ms, "rows": matched})
+
+    payload = report_inputs(df)
+    pdf = render_college_list(*payload)
+    ms = time_query(lambda: render_college_list(*payload), repeat) * 1000
+    results.append({"size": n, "bench": "report.render_college_list", "ms": ms, "rows": len(pdf)})
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results from an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r["size"], r["bench"]): r["ms"] for r in json.load(f)["results"]}
+
+    print(f"{'profiles':>10} {'benchmark':<28} {'ms':>10} {'rows':>9}" + (f" {'vs base':>8}" if baseline else ""))
+    for n in args.sizes:
+        for r in run_size(n, args.repeat, args.seed):
+            report["results"].append(r)
+            line = f"{r['size']:>10} {r['bench']:<28} {r['ms']:>10.2f} {r['rows']:>9}"
+            base = baseline.get((r["size"], r["bench"]))
+            if base:
+                line += f" {r['ms'] / base:>7.2f}x"
+            print(line, flush=True)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
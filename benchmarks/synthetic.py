@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from ingest import prepare_dataset
+
+
+# ——— Synthetic Profiles ———
+# Raw values deliberately mirror the messy spellings seen in master_data.csv
+# so the normalizers and parsers do real work.
+ETHNICITIES = [
+    "Asian", "South Asian (Indian)", "East Asian", "White", "Caucasian",
+    "Black", "African American", "Hispanic", "Latina", "Middle Eastern",
+    "Native American", "Mixed", None,
+]
+GENDERS = ["Male", "Female", "M", "F", "male", "female", "Non-binary", None]
+RESIDENCIES = ["Domestic", "International", "US Domestic", "Domestic (CA)", None]
+MAJORS = [
+    "Computer Science", "Biology", "Economics", "Mathematics", "Physics",
+    "Political Science", "Mechanical Engineering", "English", "Chemistry", None,
+]
+SCHOOLS = [
+    "Harvard University", "Yale University", "Princeton University",
+    "Columbia University", "Brown University", "Cornell University",
+    "Dartmouth College", "University of Pennsylvania", "UPenn", "Penn State",
+    "MIT", "Stanford University", "Caltech", "Georgia Tech", "Duke University",
+    "Rice University", "UC Berkeley", "UCLA", "University of Michigan",
+    "Northwestern University", "Johns Hopkins University", "NYU",
+    "Boston College", "Purdue University", "Ohio State University",
+    "Rutgers University", "Tufts University", "Vanderbilt University",
+]
+ROUNDS = ["", "", " (ED)", " (EA)", " (REA)", " (RD)"]
+ACTIVITIES = [
+    "robotics club president", "varsity soccer captain", "volunteer tutoring",
+    "research internship at university lab", "debate team", "violin in orchestra",
+    "math olympiad", "founded coding startup", "hospital volunteer",
+    "student government", "model UN", "science olympiad", "part-time job",
+    "community service", "school newspaper editor", "theater", "chess club",
+]
+
+
+def _join_sample(rng, pool, counts, sep, suffixes=None):
+    out = []
+    for k in counts:
+        picks = rng.choice(len(pool), size=k, replace=False)
+        if suffixes is None:
+            out.append(sep.join(pool[i] for i in picks))
+        else:
+            out.append(sep.join(pool[i] + suffixes[rng.integers(len(suffixes))] for i in picks))
+    return out
+
+
+def synthetic_raw(n, seed=0):
+    """A raw frame with the master_data.csv schema and n profiles."""
+    rng = np.random.default_rng(seed)
+
+    gpa = np.clip(np.round(rng.normal(3.85, 0.15, n), 2), 2.5, 4.0)
+    gpa[rng.random(n) < 0.03] = np.nan
+
+    sat = np.clip(np.round(rng.normal(1480, 80, n), -1), 400, 1600)
+    sat[rng.random(n) < 0.35] = np.nan
+    act = np.clip(np.round(rng.normal(33, 2, n)), 1, 36)
+    act[rng.random(n) < 0.6] = np.nan
+
+    def pick(pool):
+        return [pool[i] for i in rng.integers(len(pool), size=n)]
+
+    return pd.DataFrame({
+        "url": [f"https://www.reddit.com/r/collegeresults/comments/{i:07x}/" for i in range(n)],
+        "GPA": gpa,
+        "SAT_Score": sat,
+        "ACT_Score": act,
+        "Ethnicity": pick(ETHNICITIES),
+        "Gender": pick(GENDERS),
+        "Residency": pick(RESIDENCIES),
+        "Major": pick(MAJORS),
+        "acceptances": _join_sample(rng, SCHOOLS, rng.integers(0, 9, n), "\n", ROUNDS),
+        "parsed_ECs": _join_sample(rng, ACTIVITIES, rng.integers(0, 7, n), ", "),
+    })
+
+
+def synthetic_dataset(n, seed=0):
+    """synthetic_raw() run through the same ingest step as the real data."""
+    return prepare_dataset(synthetic_raw(n, seed))
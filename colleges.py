@@ -0,0 +1,138 @@
+import hashlib
+import json
+import re
+from difflib import get_close_matches
+from functools import lru_cache
+
+
+# ——— Alias Table ———
+# Canonical display name -> lowercase spellings seen in r/collegeresults posts.
+# The canonical name itself (lowercased) always resolves too.
+COLLEGE_ALIASES = {
+    "Harvard University": ["harvard", "harvard college"],
+    "Yale University": ["yale"],
+    "Princeton University": ["princeton"],
+    "Columbia University": ["columbia", "columbia college", "columbia seas", "cu"],
+    "Brown University": ["brown"],
+    "Cornell University": ["cornell"],
+    "Dartmouth College": ["dartmouth"],
+    "University of Pennsylvania": ["upenn", "penn", "u penn", "wharton", "penn wharton", "penn m&t"],
+    "Pennsylvania State University": ["penn state", "penn state university", "psu", "penn state university park"],
+    "Massachusetts Institute of Technology": ["mit"],
+    "Stanford University": ["stanford"],
+    "California Institute of Technology": ["caltech", "cal tech"],
+    "University of Chicago": ["uchicago", "u chicago", "chicago", "uchi"],
+    "Duke University": ["duke"],
+    "Northwestern University": ["northwestern", "nu"],
+    "Johns Hopkins University": ["johns hopkins", "jhu", "hopkins"],
+    "Rice University": ["rice"],
+    "Vanderbilt University": ["vanderbilt", "vandy"],
+    "Washington University in St. Louis": ["washu", "wustl", "wash u", "washington university in st louis"],
+    "University of Notre Dame": ["notre dame", "nd"],
+    "Georgetown University": ["georgetown"],
+    "Emory University": ["emory"],
+    "Carnegie Mellon University": ["carnegie mellon", "cmu"],
+    "Tufts University": ["tufts"],
+    "Boston College": ["bc"],
+    "Boston University": ["bu"],
+    "New York University": ["nyu", "nyu stern", "new york university stern"],
+    "University of Southern California": ["usc"],
+    "University of California, Berkeley": ["uc berkeley", "ucb", "berkeley", "cal"],
+    "University of California, Los Angeles": ["ucla"],
+    "University of California, San Diego": ["ucsd", "uc san diego"],
+    "University of California, Irvine": ["uci", "uc irvine"],
+    "University of California, Davis": ["ucd", "uc davis"],
+    "University of California, Santa Barbara": ["ucsb", "uc santa barbara"],
+    "University of Michigan": ["umich", "michigan", "u michigan", "university of michigan ann arbor"],
+    "University of Virginia": ["uva", "virginia"],
+    "University of North Carolina at Chapel Hill": ["unc", "unc chapel hill", "unc-chapel hill"],
+    "Georgia Institute of Technology": ["georgia tech", "gatech", "gt"],
+    "University of Texas at Austin": ["ut austin", "ut", "texas"],
+    "University of Illinois Urbana-Champaign": ["uiuc", "illinois", "university of illinois"],
+    "University of Wisconsin-Madison": ["uw madison", "wisconsin", "uw-madison"],
+    "University of Washington": ["uw", "udub", "uw seattle"],
+    "Purdue University": ["purdue"],
+    "Ohio State University": ["ohio state", "osu", "the ohio state university"],
+    "Rutgers University": ["rutgers", "rutgers new brunswick"],
+    "University of Maryland": ["umd", "maryland", "university of maryland college park"],
+    "Northeastern University": ["northeastern", "neu"],
+    "Williams College": ["williams"],
+    "Amherst College": ["amherst"],
+    "Pomona College": ["pomona"],
+    "Swarthmore College": ["swarthmore"],
+}
+
+# Canonical names are baked into prepared snapshots, so their cache keys
+# include this: editing the table invalidates them
+ALIASES_VERSION = hashlib.sha256(json.dumps(COLLEGE_ALIASES, sort_keys=True).encode()).hexdigest()[:8]
+
+DECISION_ROUNDS = re.compile(
+    r"\b(?:early decision(?: i{1,2}| [12])?|restrictive early action|early action|regular decision"
+    r"|ed ?[12]|edii?|rea|scea|ea|rd|ed)\b"
+)
+
+
+# ——— Resolver ———
+def clean_segment(raw):
+    """Lowercase a raw acceptance segment and strip round/parenthetical noise."""
+    s = str(raw).lower().split("(", 1)[0]
+    s = DECISION_ROUNDS.sub(" ", s)
+    s = re.sub(r"[^\w&' ]+", " ", s)
+    s = re.sub(r"^the\s+", "", s.strip())
+    return " ".join(s.split())
+
+
+_ALIAS_TO_CANONICAL = {
+    clean_segment(alias): canonical
+    for canonical, aliases in COLLEGE_ALIASES.items()
+    for alias in [canonical, *aliases]
+}
+_ALIAS_KEYS = list(_ALIAS_TO_CANONICAL)
+
+
+@lru_cache(maxsize=16384)
+def resolve_college(segment, cutoff=0.92):
+    """Canonical name for a raw segment, or None if it matches no alias.
+
+    Exact alias hits are a dict lookup; anything else falls back to a
+    difflib fuzzy match. Results are memoized on the raw segment, so each
+    distinct spelling pays for the fuzzy search once per process.
+    """
+    cleaned = clean_segment(segment)
+    if not cleaned:
+        return None
+    if cleaned in _ALIAS_TO_CANONICAL:
+        return _ALIAS_TO_CANONICAL[cleaned]
+    close = get_close_matches(cleaned, _ALIAS_KEYS, n=1, cutoff=cutoff)
+    return _ALIAS_TO_CANONICAL[close[0]] if close else None
+
+
+def canonical_college(segment):
+    """Canonical name when known, else the cleaned segment in title case.
+
+    Returns None for segments that are only a decision round ("ED", "RD").
+    """
+    resolved = resolve_college(segment)
+    if resolved:
+        return resolved
+    cleaned = clean_segment(segment)
+    return cleaned.title() if cleaned else None
+
+
+def exact_college(segment):
+    """canonical_college() without the fuzzy fallback: cheap enough to run
+    over every distinct spelling, at the cost of missing misspellings."""
+    cleaned = clean_segment(segment)
+    if not cleaned:
+        return None
+    return _ALIAS_TO_CANONICAL.get(cleaned) or cleaned.title()
+
+
+def canonical_colleges(segments):
+    """Map segments to canonical names, dropping blanks and duplicates."""
+    out = []
+    for seg in segments:
+        name = canonical_college(seg)
+        if name and name not in out:
+            out.append(name)
+    return out
@@ -0,0 +1,354 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import streamlit as st
+
+import shared_store
+from colleges import ALIASES_VERSION
+from dataset import Dataset
+from ingest import (
+    SNAPSHOT_FORMAT, prepare_dataset, read_snapshot, select_new_posts,
+    snapshot_urls, write_delta, write_snapshot,
+)
+from tracing import span, traced
+
+
+# ——— Dataset Source & Local Cache ———
+DATA_URL = "https://drive.google.com/uc?export=download&id=1nZtwYcUX_KraxOTAOLg6-ZvKZnKMNpSg"
+LOCAL_FALLBACK = "master_data.csv"
+CACHE_DIR = os.environ.get(
+    "MATCHMYAPP_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+DATA_TTL_SECONDS = int(os.environ.get("MATCHMYAPP_DATA_TTL", 60 * 60))
+# Set when several server processes run on one box: the prepared dataset
+# and its indexes are published there once and memory-mapped by all of them
+SHARED_DIR = os.environ.get("MATCHMYAPP_SHARED_DIR")
+
+CSV_NAME = "master_data.csv"
+META_NAME = "master_data.meta.json"
+DELTA_DIR = "deltas"
+
+# The last dataset handed out, so a TTL expiry that finds unchanged data
+# keeps serving the same object (and its indexes) instead of re-parsing.
+# "deltas" lists the incremental segments already folded into it. With
+# SHARED_DIR, "dataset" is attached from the store generation described by
+# "generation" and "path" is the source CSV, kept in case this process has
+# to publish.
+_current = {"base": None, "dataset": None, "deltas": (), "path": None, "generation": None}
+_current_lock = threading.Lock()
+_started_at = time.time()
+
+# Identifies how this code prepares a frame; snapshots and shared
+# generations made by other code are rebuilt rather than reused
+PREPARED_VERSION = f"v{SNAPSHOT_FORMAT}-{ALIASES_VERSION}"
+
+
+def _cache_path(name):
+    return os.path.join(CACHE_DIR, name)
+
+
+def _read_meta():
+    try:
+        with open(_cache_path(META_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _file_version(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def fetch_dataset(url=DATA_URL, timeout=30):
+    """Refresh the on-disk copy of the dataset and return (path, version).
+
+    The download is revalidated with ETag / Last-Modified when the server
+    supports them; otherwise the body is compared by SHA-256 so the version
+    only changes when the content does.
+    """
+    csv_path = _cache_path(CSV_NAME)
+    meta = _read_meta()
+    have_copy = os.path.exists(csv_path) and meta.get("version")
+
+    req = urllib.request.Request(url)
+    if have_copy:
+        if meta.get("etag"):
+            req.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            req.add_header("If-Modified-Since", meta["last_modified"])
+
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            headers = resp.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and have_copy:
+            return csv_path, meta["version"]
+        raise
+
+    version = hashlib.sha256(body).hexdigest()[:16]
+    if not have_copy or version != meta.get("version"):
+        _write_atomic(csv_path, body)
+    meta = {
+        "url": url,
+        "version": version,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+    }
+    _write_atomic(_cache_path(META_NAME), json.dumps(meta).encode())
+    return csv_path, version
+
+
+def _local_copy():
+    cached = _cache_path(CSV_NAME)
+    if os.path.exists(cached):
+        return cached, _read_meta().get("version") or _file_version(cached)
+    return LOCAL_FALLBACK, _file_version(LOCAL_FALLBACK)
+
+
+def _snapshot_path(version):
+    return _cache_path(f"snapshot-{version}-{PREPARED_VERSION}.arrow")
+
+
+def _load_prepared(csv_path, version):
+    snapshot = _snapshot_path(version)
+    if os.path.exists(snapshot):
+        with span("load_data.read_snapshot") as s:
+            df = read_snapshot(snapshot)
+            s.rows = len(df)
+        return df
+    with span("load_data.read_csv") as s:
+        raw = pd.read_csv(csv_path)
+        s.rows = len(raw)
+    with span("load_data.prepare") as s:
+        df = prepare_dataset(raw)
+        s.rows = len(df)
+    try:
+        write_snapshot(df, snapshot)
+    except OSError:
+        pass  # read-only cache dir: serve the in-memory frame anyway
+    return df
+
+
+@st.cache_resource(ttl=DATA_TTL_SECONDS, show_spinner="Loading dataset...")
+def _load_current():
+    try:
+        with span("load_data.fetch"):
+            path, version = fetch_dataset()
+    except Exception as e:
+        st.warning(f"Could not load remote data from Google Drive, using local copy. Error: {e}")
+        path, version = _local_copy()
+
+    with _current_lock:
+        if _current["base"] != version:
+            if SHARED_DIR:
+                # Loaded by _sync_shared(), from the store when possible
+                _current.update(base=version, path=path)
+            else:
+                ds = Dataset(_load_prepared(path, version), version)
+                _prune_deltas(set(ds.frame['url']))
+                _current.update(base=version, dataset=ds, deltas=())
+    return version
+
+
+# ——— Incremental Segments ———
+def _delta_paths():
+    delta_dir = _cache_path(DELTA_DIR)
+    if not os.path.isdir(delta_dir):
+        return []
+    return [os.path.join(delta_dir, f) for f in sorted(os.listdir(delta_dir)) if f.endswith(".arrow")]
+
+
+def _with_deltas(ds, base, paths, applied=()):
+    """ds with the segments in paths not named in applied appended."""
+    for path in paths:
+        if os.path.basename(path) in applied:
+            continue
+        try:
+            delta = read_snapshot(path)
+        except FileNotFoundError:
+            continue  # pruned by another process since it was listed
+        delta = delta[~delta['url'].isin(ds.frame['url'])]
+        if len(delta):
+            stem = os.path.basename(path)[len("delta-"):-len(".arrow")]
+            ds = ds.append(delta, f"{base}+{stem}")
+    return ds
+
+
+def _apply_deltas():
+    """Fold delta segments written since the last call into the dataset.
+
+    Only a directory listing when nothing changed; otherwise just the new
+    rows are appended and the existing indexes extended.
+    """
+    paths = tuple(_delta_paths())
+    if paths == _current["deltas"]:
+        return
+    with _current_lock:
+        applied = [os.path.basename(p) for p in _current["deltas"]]
+        ds = _with_deltas(_current["dataset"], _current["base"], paths, applied)
+        _current.update(dataset=ds, deltas=paths)
+
+
+def _prune_deltas(base_urls):
+    """Drop delta rows a new base version already contains.
+
+    Segments left empty are deleted and partly covered ones rewritten with
+    the remaining rows, so deltas don't pile up and get re-read and
+    re-filtered on every load once the full dataset has caught up.
+    """
+    for path in _delta_paths():
+        try:
+            urls = snapshot_urls(path)
+            if not urls & base_urls:
+                continue
+            if urls <= base_urls:
+                os.remove(path)
+            else:
+                delta = read_snapshot(path)
+                write_snapshot(delta[~delta['url'].isin(base_urls)].reset_index(drop=True), path)
+        except OSError:
+            pass  # pruned by another process, or a read-only cache dir
+
+
+# ——— Shared Store ———
+def _needs_publish(live, key):
+    """Whether this process has data the live generation lacks."""
+    if live is None:
+        return True
+    if live["key"].get("prepared") != key["prepared"]:
+        # Prepared by other code (snapshot format or alias table): replace it
+        # only if it was published before this process started, so old and
+        # new code don't take turns during a rolling restart
+        return live["published_at"] < _started_at
+    if live["key"]["base"] == key["base"]:
+        return not set(key["deltas"]) <= set(live["key"]["deltas"])
+    # Another base version: publish ours only if it arrived after that
+    # generation did, otherwise the other process has the newer data
+    return os.path.getmtime(_current["path"]) > live["published_at"]
+
+
+def _publish(live, key):
+    if live is not None and live["key"]["base"] == key["base"] and live["key"].get("prepared") == key["prepared"]:
+        # Same base: extend the live generation with just the new segments
+        if _attached(live):
+            ds = _current["dataset"]
+        else:
+            ds = shared_store.attach(SHARED_DIR, live)
+        applied = live["key"]["deltas"]
+    else:
+        ds, applied = Dataset(_load_prepared(_current["path"], key["base"]), key["base"]), ()
+        _prune_deltas(set(ds.frame['url']))
+    ds = _with_deltas(ds, key["base"], _delta_paths(), applied)
+    with span("load_data.publish") as s:
+        s.rows = len(ds)
+        return shared_store.publish(SHARED_DIR, ds, key)
+
+
+def _attached(live):
+    return _current["generation"] is not None and _current["generation"]["generation"] == live["generation"]
+
+
+def _sync_shared():
+    """Serve the newest published generation, publishing one first if this
+    process has newer data (a fresh download or new delta segments).
+
+    In the steady state this reads the small pointer file and lists the
+    delta directory; generations swap in between reruns.
+    """
+    key = {
+        "base": _current["base"],
+        "prepared": PREPARED_VERSION,
+        "deltas": [os.path.basename(p) for p in _delta_paths()],
+    }
+    live = shared_store.current(SHARED_DIR)
+    if not _needs_publish(live, key) and _attached(live):
+        return
+    with _current_lock:
+        live = shared_store.current(SHARED_DIR)
+        if _needs_publish(live, key):
+            with shared_store.publish_lock(SHARED_DIR):
+                live = shared_store.current(SHARED_DIR)
+                if _needs_publish(live, key):
+                    live = _publish(live, key)
+        if not _attached(live):
+            with span("load_data.attach") as s:
+                ds = shared_store.attach(SHARED_DIR, live)
+                s.rows = len(ds)
+            _current.update(dataset=ds, generation=live)
+
+
+def shared_generation():
+    """Metadata of the attached shared generation, or None when not sharing."""
+    return _current["generation"]
+
+
+def ingest_new_posts(raw):
+    """Prepare only the posts not seen before and store them as a delta.
+
+    Returns (delta path or None, number of new profiles). Running apps pick
+    the segment up on their next load_dataset() call.
+    """
+    csv_path, version = _local_copy()
+    if os.path.exists(_snapshot_path(version)):
+        known = snapshot_urls(_snapshot_path(version))
+    else:
+        # No snapshot yet (fresh box, or run before the app ever loaded):
+        # the base CSV's url column is all that's needed
+        known = set(pd.read_csv(csv_path, usecols=['url'])['url'])
+    for path in _delta_paths():
+        known |= snapshot_urls(path)
+
+    new = select_new_posts(raw, known)
+    if new.empty:
+        return None, 0
+    return write_delta(prepare_dataset(new), _cache_path(DELTA_DIR)), len(new)
+
+
+# ——— Public API ———
+@traced("load_data")
+def load_dataset():
+    """The shared Dataset: prepared frame, version and indexes."""
+    _load_current()
+    if SHARED_DIR:
+        _sync_shared()
+    else:
+        _apply_deltas()
+    return _current["dataset"]
+
+
+def load_data():
+    """The shared, prepared dataset frame (see ingest.prepare_dataset).
+
+    Treat it as read-only: every session sees the same object.
+    """
+    return load_dataset().frame
+
+
+def data_version():
+    """Version of the dataset currently served, including applied deltas."""
+    return load_dataset().version
+
+
+def refresh_data():
+    """Drop the in-memory copy so the next load revalidates against the source."""
+    _load_current.clear()
@@ -0,0 +1,95 @@
+from functools import cached_property
+
+import numpy as np
+
+from aggregates import school_stats
+from indexes import CollegeIndex, ECIndex, ScoreIndex, TfidfIndex
+from ingest import concat_prepared, memory_report
+from neighbors import feature_scales
+
+INDEXES = ("score_index", "ec_index", "ec_tfidf", "college_index")
+
+
+def _array_bytes(obj):
+    # NumPy arrays held by an index, one level of nesting deep (Postings)
+    total = 0
+    for value in vars(obj).values():
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif hasattr(value, "__dict__") and not isinstance(value, type):
+            total += sum(v.nbytes for v in vars(value).values() if isinstance(v, np.ndarray))
+    return total
+
+
+class Dataset:
+    """The prepared profile frame plus the indexes built over it.
+
+    Indexes are built lazily on first use and live as long as this
+    dataset version is being served.
+    """
+
+    def __init__(self, frame, version):
+        self.frame = frame
+        self.version = version
+
+    def __len__(self):
+        return len(self.frame)
+
+    def append(self, new_rows, version):
+        """A new Dataset with prepared new_rows added after the current rows.
+
+        Indexes that are already built are extended with just the new rows;
+        this dataset is left untouched for sessions still reading it.
+        """
+        ds = Dataset(concat_prepared(self.frame, new_rows), version)
+        for name in INDEXES:
+            if name in self.__dict__:
+                ds.__dict__[name] = self.__dict__[name].extended(new_rows)
+        return ds
+
+    def memory_report(self):
+        """Bytes held per column of the frame and per built index.
+
+        Same layout as ingest.memory_report(); index rows count their NumPy
+        arrays only.
+        """
+        report = memory_report(self.frame).drop(index="total")
+        n = max(len(self), 1)
+        for name in INDEXES:
+            if name in self.__dict__:
+                size = _array_bytes(self.__dict__[name])
+                report.loc[f"[{name}]"] = [size, size / n]
+        report = report.sort_values("bytes", ascending=False)
+        report.loc["total"] = report.sum()
+        return report
+
+    @cached_property
+    def score_index(self):
+        return ScoreIndex.build(self.frame)
+
+    @cached_property
+    def ec_index(self):
+        return ECIndex.build(self.frame)
+
+    @cached_property
+    def ec_tfidf(self):
+        return TfidfIndex.build(self.frame)
+
+    @cached_property
+    def college_index(self):
+        return CollegeIndex.build(self.frame)
+
+    @cached_property
+    def majors(self):
+        """Distinct majors in order of first appearance (see wizard.match_major)."""
+        return [str(m) for m in self.frame['Major'].dropna().unique()]
+
+    @cached_property
+    def feature_scales(self):
+        """(GPA, unified score) standard deviations used by closest_twins()."""
+        return feature_scales(self.score_index)
+
+    @cached_property
+    def school_stats(self):
+        """Per-school acceptance statistics (see aggregates.school_stats)."""
+        return school_stats(self)
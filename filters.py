@@ -0,0 +1,158 @@
+import re
+
+import numpy as np
+
+
+# ——— Vectorized Predicates ———
+# Every helper returns a NumPy boolean mask aligned with `rows` (or with the
+# whole frame when rows is None), so callers can AND them together and
+# materialize the matching profiles exactly once.
+
+def column_values(df, col, rows=None):
+    # Select rows before widening, so float32 score columns only convert
+    # the values that are read
+    values = df[col].to_numpy(na_value=np.nan)
+    if rows is not None:
+        values = values[rows]
+    return values.astype("float64", copy=False)
+
+
+def range_mask(values, lo, hi):
+    # NaN compares False on both sides, so missing scores never match
+    return (values >= lo) & (values <= hi)
+
+
+def category_mask(series, value, rows=None):
+    codes = series.cat.codes.to_numpy()
+    if rows is not None:
+        codes = codes[rows]
+    categories = series.cat.categories
+    if value not in categories:
+        return np.zeros(len(codes), dtype=bool)
+    return codes == categories.get_loc(value)
+
+
+def equals_mask(df, col, value, rows=None):
+    values = df[col].to_numpy()
+    if rows is not None:
+        values = values[rows]
+    return values == value
+
+
+# ——— Query Masks ———
+def profile_mask(df, gpa, sat, act, eth, gen, use_gpa=True, rows=None):
+    """Profile Filter tab: ±0.05 GPA, ±30 SAT, ±1 ACT, exact ethnicity/gender."""
+    has_acc = df['has_acc'].to_numpy()
+    mask = has_acc.copy() if rows is None else has_acc[rows]
+
+    if eth != "No filter":
+        mask &= category_mask(df['Eth_norm'], eth.lower(), rows)
+    if gen != "No filter":
+        mask &= category_mask(df['Gen_norm'], gen.lower(), rows)
+    if use_gpa and gpa is not None:
+        mask &= range_mask(column_values(df, 'GPA', rows), gpa - 0.05, gpa + 0.05)
+    if sat is not None:
+        mask &= range_mask(column_values(df, 'SAT_Score', rows), sat - 30, sat + 30)
+    if act is not None:
+        mask &= range_mask(column_values(df, 'ACT_Score', rows), act - 1, act + 1)
+    return mask
+
+
+def score_mask(df, sat, act, rows=None):
+    """Wizard score match: SAT ±30, ACT ±1, or ACT converted to SAT (×45) ±30."""
+    sat_col = column_values(df, 'SAT_Score', rows)
+    mask = np.zeros(len(sat_col), dtype=bool)
+    if sat is not None:
+        mask |= range_mask(sat_col, sat - 30, sat + 30)
+    if act is not None:
+        mask |= range_mask(column_values(df, 'ACT_Score', rows), act - 1, act + 1)
+        mask |= range_mask(sat_col, act * 45 - 30, act * 45 + 30)
+    return mask
+
+
+def wizard_mask(df, gpa, sat, act, residency, major=None, rows=None):
+    """College List Wizard: residency, ±0.1 GPA, test score and major."""
+    mask = category_mask(df['Residency_norm'], residency, rows)
+    if gpa is not None:
+        mask &= range_mask(column_values(df, 'GPA', rows), gpa - 0.1, gpa + 0.1)
+    if sat or act:
+        mask &= score_mask(df, sat, act, rows)
+    if major:
+        mask &= category_mask(df['Major'], major, rows)
+    return mask
+
+
+# ——— Index-backed Row Selection ———
+def _rows(ds, mask_fn, gpa_window, score_window):
+    candidates = ds.score_index.candidates(gpa_window, score_window)
+    mask = mask_fn(candidates)
+    if candidates is None:
+        return np.flatnonzero(mask)
+    return candidates[mask]
+
+
+def profile_rows(ds, gpa, sat, act, eth, gen, use_gpa=True):
+    """Row positions matching profile_mask(), fetched through the score index."""
+    gpa_window = (gpa - 0.05, gpa + 0.05) if use_gpa and gpa is not None else None
+    # SAT_Score within ±30 implies SAT_Adjusted == SAT_Score within ±30
+    score_window = (sat - 30, sat + 30) if sat is not None else None
+    return _rows(
+        ds,
+        lambda rows: profile_mask(ds.frame, gpa, sat, act, eth, gen, use_gpa, rows),
+        gpa_window, score_window,
+    )
+
+
+def wizard_rows(ds, gpa, sat, act, residency, major=None):
+    """Row positions matching wizard_mask(), fetched through the score index."""
+    gpa_window = (gpa - 0.1, gpa + 0.1) if gpa is not None else None
+    # An ACT match can come from a row whose SAT_Adjusted is its SAT, so only
+    # a pure SAT query narrows on the unified score
+    score_window = (sat - 30, sat + 30) if sat and act is None else None
+    return _rows(
+        ds,
+        lambda rows: wizard_mask(ds.frame, gpa, sat, act, residency, major, rows),
+        gpa_window, score_window,
+    )
+
+
+def ec_rows(ds, keywords, min_hits=1, rows=None, min_score=0.0):
+    """Rows mentioning at least min_hits of keywords and scoring at least
+    min_score, most similar ECs first.
+
+    Returns (positions, hits, scores): hits[i] lists the keywords found in
+    positions[i] and scores[i] is its TF-IDF cosine similarity to the query.
+    """
+    matched, hits = ds.ec_index.match(keywords, min_hits=min_hits, rows=rows)
+    scores = ds.ec_tfidf.scores(keywords, matched)
+    order = np.argsort(-scores, kind="stable")
+    order = order[scores[order] >= min_score]
+    return matched[order], [hits[i] for i in order], scores[order]
+
+
+def parse_college_query(colleges_input):
+    """Split the college search box into (mode, include, exclude).
+
+    Terms are comma-separated and ANDed, or ORed when the input contains
+    " or ". A term prefixed with "not " or "-" excludes that college.
+    """
+    if " or " in colleges_input.lower():
+        mode, parts = "or", re.split(r"\s+or\s+", colleges_input, flags=re.IGNORECASE)
+    else:
+        mode, parts = "and", colleges_input.split(",")
+
+    include, exclude = [], []
+    for part in parts:
+        term = part.strip().lower()
+        negated = re.match(r"(?:not\s+|-)\s*(.+)", term)
+        if negated:
+            exclude.append(negated.group(1).strip())
+        elif term:
+            include.append(term)
+    return mode, include, exclude
+
+
+def college_rows(ds, colleges_input):
+    """Row positions matching the Filter by College Acceptances query."""
+    mode, include, exclude = parse_college_query(colleges_input)
+    return ds.college_index.query(include, exclude, mode)
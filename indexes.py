@@ -0,0 +1,464 @@
+import re
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from colleges import exact_college, resolve_college
+from filters import column_values
+
+
+# ——— Range Index over GPA and Unified Score ———
+class ScoreIndex:
+    """Sorted copies of GPA and SAT_Adjusted for window lookups.
+
+    A window query is two binary searches plus a slice, so fetching the k
+    candidate rows costs O(log n + k) instead of a scan of the whole frame.
+    Missing values sort last and never fall inside a finite window.
+    """
+
+    # Above this share of the dataset a sequential mask beats gathering
+    # scattered candidate rows, so candidates() reports "scan everything".
+    FULL_SCAN_FRACTION = 0.1
+
+    def __init__(self, gpa, score, gpa_order=None, score_order=None):
+        self.gpa = gpa
+        self.score = score
+        self.gpa_order = np.argsort(gpa, kind="stable") if gpa_order is None else gpa_order
+        self.gpa_sorted = gpa[self.gpa_order]
+        self.score_order = np.argsort(score, kind="stable") if score_order is None else score_order
+        self.score_sorted = score[self.score_order]
+
+    @classmethod
+    def build(cls, df):
+        return cls(column_values(df, 'GPA'), column_values(df, 'SAT_Adjusted'))
+
+    @staticmethod
+    def _merge_order(sorted_values, order, new_values, offset):
+        new_order = np.argsort(new_values, kind="stable")
+        at = np.searchsorted(sorted_values, new_values[new_order], side="right")
+        return np.insert(order, at, new_order + offset)
+
+    def extended(self, df_new):
+        """Index over the current rows followed by df_new's rows.
+
+        The new rows are sorted on their own and spliced into the existing
+        order, so the cost is O(n) copying rather than a fresh O(n log n) sort.
+        """
+        gpa_new = column_values(df_new, 'GPA')
+        score_new = column_values(df_new, 'SAT_Adjusted')
+        offset = len(self)
+        return ScoreIndex(
+            np.concatenate([self.gpa, gpa_new]),
+            np.concatenate([self.score, score_new]),
+            self._merge_order(self.gpa_sorted, self.gpa_order, gpa_new, offset),
+            self._merge_order(self.score_sorted, self.score_order, score_new, offset),
+        )
+
+    def __len__(self):
+        return len(self.gpa)
+
+    @staticmethod
+    def _bounds(sorted_values, window):
+        lo, hi = window
+        return (np.searchsorted(sorted_values, lo, side="left"),
+                np.searchsorted(sorted_values, hi, side="right"))
+
+    def candidates(self, gpa_window=None, score_window=None, max_fraction=None):
+        """Ascending row positions inside every given (lo, hi) window.
+
+        Returns None, meaning "scan every row", when no window is given or
+        the narrowest window holds more than max_fraction of the rows
+        (FULL_SCAN_FRACTION by default) for the index to pay off.
+        """
+        spans = []
+        if gpa_window is not None:
+            start, stop = self._bounds(self.gpa_sorted, gpa_window)
+            spans.append((stop - start, self.gpa_order[start:stop], self.score, score_window))
+        if score_window is not None:
+            start, stop = self._bounds(self.score_sorted, score_window)
+            spans.append((stop - start, self.score_order[start:stop], self.gpa, gpa_window))
+        if not spans:
+            return None
+
+        # Walk the narrower window, check the other one on its k rows only
+        size, rows, other_values, other_window = min(spans, key=lambda span: span[0])
+        if size > (self.FULL_SCAN_FRACTION if max_fraction is None else max_fraction) * len(self):
+            return None
+        if len(spans) == 2:
+            lo, hi = other_window
+            values = other_values[rows]
+            rows = rows[(values >= lo) & (values <= hi)]
+        return np.sort(rows)
+
+
+# ——— Postings Lists ———
+class Postings:
+    """Term -> sorted row positions, laid out CSR-style.
+
+    `terms` is the sorted vocabulary; the rows for terms[i] are
+    rows[offsets[i]:offsets[i + 1]]. Because the vocabulary is sorted, all
+    terms sharing a prefix are one contiguous slice of `rows`. `data`, when
+    present, holds a value per posting aligned with `rows` (term counts for
+    from_documents(counts=True)).
+    """
+
+    def __init__(self, terms, offsets, rows, data=None):
+        self.terms = terms
+        self.offsets = offsets
+        self.rows = rows
+        self.data = data
+
+    @classmethod
+    def from_documents(cls, documents, counts=False):
+        """Build from an iterable of per-row term collections."""
+        term_ids, term_col, row_col, count_col = {}, [], [], []
+        for row, doc in enumerate(documents):
+            for term, n in (Counter(doc).items() if counts else ((t, 1) for t in set(doc))):
+                term_col.append(term_ids.setdefault(term, len(term_ids)))
+                row_col.append(row)
+                count_col.append(n)
+
+        terms = sorted(term_ids)
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[[term_ids[t] for t in terms]] = np.arange(len(terms))
+        term_col = rank[np.asarray(term_col, dtype=np.int64)]
+        row_col = np.asarray(row_col, dtype=np.int32)
+
+        order = np.lexsort((row_col, term_col))
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_col, minlength=len(terms)), out=offsets[1:])
+        data = np.asarray(count_col, dtype=np.int32)[order] if counts else None
+        return cls(terms, offsets, row_col[order], data)
+
+    @classmethod
+    def from_lists(cls, lists):
+        """Build from a column of per-row term lists without visiting rows in Python.
+
+        lists is anything pyarrow reads as list<string>; Arrow-backed list
+        columns are used in place.
+        """
+        lists = pa.array(lists, type=pa.list_(pa.string()))
+        if isinstance(lists, pa.ChunkedArray):
+            lists = lists.combine_chunks()
+        encoded = pc.list_flatten(lists).dictionary_encode()
+        row_col = pc.list_parent_indices(lists).to_numpy().astype(np.int32)
+
+        terms = encoded.dictionary.to_pylist()
+        order = np.argsort(np.array(terms, dtype=object), kind="stable")
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[order] = np.arange(len(terms))
+        term_col = rank[encoded.indices.to_numpy()]
+
+        # One posting per (term, row), sorted by term then row
+        keys = np.unique(term_col * len(lists) + row_col)
+        term_col, row_col = keys // len(lists), (keys % len(lists)).astype(np.int32)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_col, minlength=len(terms)), out=offsets[1:])
+        return cls([terms[i] for i in order], offsets, row_col)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def merged(self, other, row_offset):
+        """Postings over both row sets, other's rows shifted by row_offset.
+
+        All of other's rows come after ours, so each term's merged list is
+        our block followed by other's block and no re-sort is needed.
+        """
+        terms = sorted(set(self.terms).union(other.terms))
+        position = {term: i for i, term in enumerate(terms)}
+
+        def scatter(postings):
+            ids = np.array([position[t] for t in postings.terms], dtype=np.int64)
+            per_term = np.diff(postings.offsets)
+            counts = np.zeros(len(terms), dtype=np.int64)
+            counts[ids] = per_term
+            term_of = np.repeat(ids, per_term)
+            rank = np.arange(len(postings.rows)) - np.repeat(postings.offsets[:-1], per_term)
+            return counts, term_of, rank
+
+        ours, ours_term, ours_rank = scatter(self)
+        theirs, theirs_term, theirs_rank = scatter(other)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(ours + theirs, out=offsets[1:])
+
+        ours_at = offsets[ours_term] + ours_rank
+        theirs_at = offsets[theirs_term] + ours[theirs_term] + theirs_rank
+        rows = np.empty(offsets[-1], dtype=self.rows.dtype)
+        rows[ours_at] = self.rows
+        rows[theirs_at] = other.rows + row_offset
+        data = None
+        if self.data is not None:
+            data = np.empty(offsets[-1], dtype=self.data.dtype)
+            data[ours_at] = self.data
+            data[theirs_at] = other.data
+        return Postings(terms, offsets, rows, data)
+
+    def lookup(self, term):
+        i = bisect_left(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            return self.rows[:0]
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    def prefix_range(self, prefix):
+        """(lo, hi) such that terms[lo:hi] are the terms starting with prefix."""
+        lo = bisect_left(self.terms, prefix)
+        return lo, bisect_left(self.terms, prefix + chr(0x10FFFF), lo)
+
+    def lookup_prefix(self, prefix):
+        """Sorted, de-duplicated rows of every term starting with prefix."""
+        lo, hi = self.prefix_range(prefix)
+        if hi - lo == 1:
+            return self.rows[self.offsets[lo]:self.offsets[hi]]
+        return np.unique(self.rows[self.offsets[lo]:self.offsets[hi]])
+
+
+# ——— Extracurricular Keyword Index ———
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+class ECIndex:
+    """Inverted index over the words of parsed_ECs.
+
+    In prefix mode (the default) a keyword matches every word it starts,
+    so "robot" still finds "robotics" the way the old substring search did.
+    """
+
+    def __init__(self, postings, n_rows, prefix=True):
+        self.postings = postings
+        self.n_rows = n_rows
+        self.prefix = prefix
+
+    @classmethod
+    def build(cls, df, prefix=True):
+        return cls(Postings.from_documents(map(tokenize, df['parsed_ECs'])), len(df), prefix)
+
+    def extended(self, df_new):
+        """Index over the current rows followed by df_new's rows."""
+        added = Postings.from_documents(map(tokenize, df_new['parsed_ECs']))
+        return ECIndex(self.postings.merged(added, self.n_rows), self.n_rows + len(df_new), self.prefix)
+
+    def rows_for(self, keyword, prefix=None):
+        prefix = self.prefix if prefix is None else prefix
+        return self.postings.lookup_prefix(keyword) if prefix else self.postings.lookup(keyword)
+
+    def match(self, keywords, min_hits=1, rows=None, prefix=None):
+        """Rows containing at least min_hits of keywords, plus the hits per row.
+
+        Returns (positions, hits) where positions is ascending and hits[i]
+        lists the keywords found in row positions[i]. When rows is given
+        the search is restricted to those positions.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        per_keyword = [self.rows_for(kw, prefix) for kw in keywords]
+        if rows is not None:
+            allowed = np.zeros(self.n_rows, dtype=bool)
+            allowed[rows] = True
+            per_keyword = [p[allowed[p]] for p in per_keyword]
+
+        if not per_keyword:
+            return np.empty(0, dtype=np.int64), []
+        found, counts = np.unique(np.concatenate(per_keyword), return_counts=True)
+        matched = found[counts >= min_hits]
+
+        hits = [[] for _ in range(len(matched))]
+        for kw, postings in zip(keywords, per_keyword):
+            where = np.searchsorted(postings, matched)
+            present = where < len(postings)
+            present[present] = postings[where[present]] == matched[present]
+            for i in np.flatnonzero(present):
+                hits[i].append(kw)
+        return matched.astype(np.int64), hits
+
+
+# ——— TF-IDF over Extracurriculars ———
+class TfidfIndex:
+    """L2-normalized TF-IDF vectors of parsed_ECs, stored term-major.
+
+    The matrix is kept as postings with a weight per entry (the CSR layout
+    of its transpose), so scoring every profile against a query is one
+    sparse mat-vec that only touches the columns of the query's terms:
+    gather their postings, multiply by the query weights, and bincount
+    into rows. Weights use sublinear tf and smoothed idf.
+    """
+
+    def __init__(self, postings, n_rows, prefix=True):
+        self.postings = postings
+        self.n_rows = n_rows
+        self.prefix = prefix
+
+        per_term = np.diff(postings.offsets)
+        self.idf = np.log((1 + n_rows) / (1 + per_term)) + 1
+        weights = (1 + np.log(postings.data)) * np.repeat(self.idf, per_term)
+        norms = np.sqrt(np.bincount(postings.rows, weights=weights ** 2, minlength=n_rows))
+        self.weights = weights / norms[postings.rows]
+
+    @classmethod
+    def build(cls, df, prefix=True):
+        return cls(Postings.from_documents(map(tokenize, df['parsed_ECs']), counts=True), len(df), prefix)
+
+    def extended(self, df_new):
+        """Index over the current rows followed by df_new's rows (idf is recomputed)."""
+        added = Postings.from_documents(map(tokenize, df_new['parsed_ECs']), counts=True)
+        return TfidfIndex(self.postings.merged(added, self.n_rows), self.n_rows + len(df_new), self.prefix)
+
+    def _query_terms(self, keywords):
+        # In prefix mode a keyword expands to every term it starts, as in ECIndex
+        terms = set()
+        for kw in dict.fromkeys(keywords):
+            lo, hi = self.postings.prefix_range(kw)
+            if not self.prefix:
+                hi = lo + 1 if lo < hi and self.postings.terms[lo] == kw else lo
+            terms.update(range(lo, hi))
+        return np.fromiter(sorted(terms), dtype=np.int64, count=len(terms))
+
+    def scores(self, keywords, rows=None):
+        """Cosine similarity of each profile's ECs to the keywords.
+
+        Returns a float array aligned with rows, or with every profile when
+        rows is None. Profiles sharing no term with the query score 0.
+        """
+        terms = self._query_terms(keywords)
+        scores = np.zeros(self.n_rows)
+        if len(terms):
+            q = self.idf[terms]
+            starts, stops = self.postings.offsets[terms], self.postings.offsets[terms + 1]
+            lengths = stops - starts
+            entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            scores = np.bincount(
+                self.postings.rows[entries],
+                weights=self.weights[entries] * np.repeat(q, lengths),
+                minlength=self.n_rows,
+            ) / np.linalg.norm(q)
+        return scores if rows is None else scores[rows]
+
+
+# ——— College Acceptance Index ———
+# Search terms whose school ids each CollegeIndex remembers
+TERM_CACHE_SIZE = 1024
+
+def _spellings(acc_clean):
+    """Canonical name -> lowercase spellings of it in the acc_clean column."""
+    segments = pc.split_pattern(pa.array(acc_clean, type=pa.string()), ",")
+    if isinstance(segments, pa.ChunkedArray):
+        segments = segments.combine_chunks()
+    distinct = pc.unique(pc.utf8_lower(pc.utf8_trim_whitespace(pc.list_flatten(segments))))
+    out = {}
+    for segment in distinct.to_pylist():
+        name = segment and exact_college(segment)
+        if name:
+            out.setdefault(name, set()).add(segment)
+    return out
+
+
+class CollegeIndex:
+    """Canonical school -> sorted rows accepted there.
+
+    A school's ID is its position in the sorted vocabulary of canonical
+    names. Search terms are resolved to IDs once, and the row work is pure
+    set algebra on sorted id arrays.
+    """
+
+    def __init__(self, postings, all_rows, n_rows, spellings):
+        self.postings = postings
+        self.all_rows = all_rows
+        self.n_rows = n_rows
+        self.spellings = spellings
+        # What substring search looks in: the spellings posts actually used,
+        # so "tech" finds Georgia Tech but not MIT by its canonical name
+        self._search_text = ["\n".join(sorted(spellings.get(name, ()))) for name in postings.terms]
+        # Keyed by whatever users type, so bounded (least recently used out)
+        self._term_cache = OrderedDict()
+
+    @classmethod
+    def build(cls, df):
+        postings = Postings.from_lists(df['colleges'])
+        return cls(postings, np.flatnonzero(df['has_acc'].to_numpy()), len(df), _spellings(df['acc_clean']))
+
+    def extended(self, df_new):
+        """Index over the current rows followed by df_new's rows."""
+        added = Postings.from_lists(df_new['colleges'])
+        new_rows = np.flatnonzero(df_new['has_acc'].to_numpy()) + self.n_rows
+        spellings = {name: set(seen) for name, seen in self.spellings.items()}
+        for name, seen in _spellings(df_new['acc_clean']).items():
+            spellings.setdefault(name, set()).update(seen)
+        return CollegeIndex(
+            self.postings.merged(added, self.n_rows),
+            np.concatenate([self.all_rows, new_rows]),
+            self.n_rows + len(df_new),
+            spellings,
+        )
+
+    def school_id(self, name):
+        i = bisect_left(self.postings.terms, name)
+        if i < len(self.postings.terms) and self.postings.terms[i] == name:
+            return i
+        return None
+
+    def school_rows(self, name):
+        """Rows accepted to the school with exactly this canonical name."""
+        sid = self.school_id(name)
+        if sid is None:
+            return self.postings.rows[:0]
+        return self.postings.rows[self.postings.offsets[sid]:self.postings.offsets[sid + 1]]
+
+    def schools_matching(self, term):
+        """IDs for a search term: every school with a spelling containing the
+        term, plus its canonical school when the alias table knows it.
+
+        The alias only ever adds schools, so "michigan" still finds Michigan
+        State while "upenn" also finds posts that wrote "Penn".
+        """
+        cache = self._term_cache
+        ids = cache.get(term)
+        if ids is not None:
+            try:
+                cache.move_to_end(term)
+            except KeyError:
+                pass  # evicted by another session in between
+            return ids
+        ids = {i for i, text in enumerate(self._search_text) if term in text}
+        canonical = resolve_college(term)
+        sid = None if canonical is None else self.school_id(canonical)
+        if sid is not None:
+            ids.add(sid)
+        ids = cache[term] = sorted(ids)
+        while len(cache) > TERM_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        return ids
+
+    def rows_for(self, term):
+        offsets, rows = self.postings.offsets, self.postings.rows
+        parts = [rows[offsets[i]:offsets[i + 1]] for i in self.schools_matching(term)]
+        if not parts:
+            return rows[:0]
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def query(self, include, exclude=(), mode="and"):
+        """Rows accepted to all (mode="and") or any (mode="or") of include,
+        and to none of exclude."""
+        if include:
+            sets = [self.rows_for(term) for term in include]
+            result = sets[0]
+            for other in sets[1:]:
+                if mode == "and":
+                    result = np.intersect1d(result, other, assume_unique=True)
+                else:
+                    result = np.union1d(result, other)
+        else:
+            result = self.all_rows
+        for term in exclude:
+            result = np.setdiff1d(result, self.rows_for(term), assume_unique=True)
+        return result.astype(np.int64)
@@ -0,0 +1,172 @@
+import argparse
+import hashlib
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from colleges import canonical_colleges
+from normalize import (
+    normalize_ethnicity, normalize_gender, normalize_residency,
+    clean_acceptances, extract_clean_colleges, unified_sat,
+)
+
+
+# ——— Derived Columns ———
+# Bump whenever prepare_dataset() changes so stale snapshots are rebuilt.
+SNAPSHOT_FORMAT = 5
+
+# Storage types of the shared frame. Low-cardinality fields are categoricals
+# (one small integer code per profile). Scores are float32, which holds
+# every SAT/ACT value exactly; GPA stays float64 so the ±0.05 windows match
+# the same profiles. Free text lives in Arrow string buffers, and the
+# per-profile school lists in one Arrow list array instead of a Python list
+# (or, after a snapshot round trip, a NumPy array) per row.
+CATEGORICAL_COLUMNS = ["Eth_norm", "Gen_norm", "Residency_norm", "Ethnicity", "Gender", "Residency", "Major"]
+FLOAT32_COLUMNS = ["SAT_Score", "ACT_Score", "SAT_Adjusted"]
+TEXT_COLUMNS = ["url", "acceptances", "parsed_ECs", "acc_clean"]
+LIST_COLUMNS = ["college_list", "colleges"]
+
+TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+LIST_DTYPE = pd.ArrowDtype(pa.list_(pa.string()))
+
+
+def prepare_dataset(raw):
+    """Compute every derived column the query paths filter on.
+
+    Runs the row-wise normalizers exactly once per dataset version so the
+    app only ever filters the result.
+    """
+    df = raw.reset_index(drop=True)
+    df = df.assign(
+        Eth_norm=df['Ethnicity'].apply(normalize_ethnicity),
+        Gen_norm=df['Gender'].apply(normalize_gender),
+        Residency_norm=df['Residency'].apply(normalize_residency),
+        acc_clean=df['acceptances'].apply(clean_acceptances),
+        SAT_Adjusted=unified_sat(df),
+        college_list=df['acceptances'].apply(extract_clean_colleges),
+    )
+    df['has_acc'] = df['acc_clean'] != ""
+    # Canonical school names: "UPenn", "Penn (ED)" and "University of
+    # Pennsylvania" all become one entry
+    df['colleges'] = df['acc_clean'].map(lambda acc: canonical_colleges(acc.split(",")))
+    df['college_list'] = df['college_list'].map(canonical_colleges)
+    return compact(df)
+
+
+def compact(df):
+    """df with every column in its storage type (see CATEGORICAL_COLUMNS etc.)."""
+    return df.astype(
+        {c: "category" for c in CATEGORICAL_COLUMNS}
+        | {c: "float32" for c in FLOAT32_COLUMNS}
+        | {c: TEXT_DTYPE for c in TEXT_COLUMNS}
+        | {c: LIST_DTYPE for c in LIST_COLUMNS}
+    )
+
+
+def memory_report(df):
+    """Bytes held by each column, counting string and list payloads.
+
+    Returns a frame indexed by column with total bytes and bytes per
+    profile, sorted largest first, plus a "total" row.
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({"bytes": usage, "per_profile": usage / max(len(df), 1)})
+    report = report.sort_values("bytes", ascending=False)
+    report.loc["total"] = report.sum()
+    return report
+
+
+# ——— Columnar Snapshot ———
+def write_snapshot(df, path):
+    """Write a prepared frame as an uncompressed Arrow IPC file.
+
+    Uncompressed IPC (Feather v2) is what lets read_snapshot() memory-map
+    the file instead of decoding it.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with pa.OSFile(tmp, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _arrow_types(arrow_type):
+    # Keep list columns Arrow-backed instead of one NumPy array per row
+    if pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def read_snapshot(path):
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(types_mapper=_arrow_types)
+
+
+def snapshot_urls(path):
+    """The url column of a snapshot, read without materializing the rest."""
+    with pa.memory_map(path, "r") as source:
+        return set(pa.ipc.open_file(source).read_all().column('url').to_pylist())
+
+
+# ——— Incremental Ingest ———
+def select_new_posts(raw, known_urls):
+    """Rows of raw whose url is not in known_urls, first occurrence wins."""
+    raw = raw.drop_duplicates(subset='url')
+    return raw[~raw['url'].isin(known_urls)]
+
+
+def concat_prepared(base, new):
+    """Append prepared rows to a prepared frame, keeping categorical dtypes.
+
+    Both sides get the union of categories first; pd.concat would otherwise
+    fall back to object columns whenever the category sets differ.
+    """
+    base, new = base.copy(deep=False), new.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS:
+        categories = base[col].cat.categories.union(new[col].cat.categories)
+        base[col] = base[col].cat.set_categories(categories)
+        new[col] = new[col].cat.set_categories(categories)
+    return pd.concat([base, new], ignore_index=True)
+
+
+def write_delta(prepared, delta_dir):
+    """Write newly ingested rows as a delta segment next to the base snapshot.
+
+    Names sort chronologically, so loaders apply deltas in ingest order.
+    """
+    digest = hashlib.sha256("\n".join(prepared['url']).encode()).hexdigest()[:8]
+    path = os.path.join(delta_dir, f"delta-{datetime.now():%Y%m%d%H%M%S}-{digest}.arrow")
+    write_snapshot(prepared, path)
+    return path
+
+
+def build_snapshot(csv_path, out_path):
+    df = prepare_dataset(pd.read_csv(csv_path))
+    write_snapshot(df, out_path)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or extend the columnar snapshot the app loads.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="prepare a full dataset CSV into a snapshot")
+    build.add_argument("csv", help="raw dataset CSV (same schema as master_data.csv)")
+    build.add_argument("out", help="output .arrow snapshot path")
+    append = commands.add_parser("append", help="ingest newly scraped posts into the app's cache")
+    append.add_argument("csv", help="CSV of new posts, same schema; rows with a known url are skipped")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        df = build_snapshot(args.csv, args.out)
+        print(f"Wrote {len(df)} profiles to {args.out}")
+        print(memory_report(df).to_string(float_format="{:,.1f}".format))
+    else:
+        from data_loader import ingest_new_posts
+        path, added = ingest_new_posts(pd.read_csv(args.csv))
+        print(f"Ingested {added} new profiles" + (f" into {path}" if path else ""))
@@ -0,0 +1,287 @@
+import os
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+
+from tracing import span
+
+
+# ——— Settings ———
+class SMTPSettings:
+    """Where and how the delivery worker connects.
+
+    Leave username unset to skip login, e.g. when pointing the worker at a
+    local aiosmtpd instance with use_ssl=False for testing.
+    """
+
+    def __init__(self, host, port, sender, username=None, password=None, use_ssl=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+
+    @classmethod
+    def from_secrets(cls, secrets):
+        return cls(
+            host=secrets.get("SMTP_HOST", "smtp.gmail.com"),
+            port=int(secrets.get("SMTP_PORT", 465)),
+            sender=secrets["EMAIL_ADDRESS"],
+            username=secrets.get("SMTP_USERNAME", secrets["EMAIL_ADDRESS"]),
+            password=secrets.get("EMAIL_APP_PASSWORD"),
+            use_ssl=str(secrets.get("SMTP_SSL", "true")).lower() == "true",
+        )
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+# ——— Persistent Queue ———
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mail_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachment BLOB,
+    filename TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_error TEXT,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS mail_jobs_due ON mail_jobs (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS mail_jobs_recipient ON mail_jobs (recipient, created_at);
+"""
+# Columns added after the first release, for outboxes created before them
+MIGRATIONS = (
+    ("claimed_by", "ALTER TABLE mail_jobs ADD COLUMN claimed_by TEXT"),
+    ("claimed_at", "ALTER TABLE mail_jobs ADD COLUMN claimed_at REAL"),
+)
+
+
+class MailQueue:
+    """SQLite-backed outbox shared by every session (and every process) on a box.
+
+    A claimed job is leased to one worker for lease_seconds. Only once the
+    lease has expired (its worker died mid-batch) may another worker claim
+    it again, so live workers never send each other's jobs.
+    """
+
+    def __init__(self, path, per_recipient_limit=5, rate_window=3600, lease_seconds=900):
+        self.path = path
+        self.per_recipient_limit = per_recipient_limit
+        self.rate_window = rate_window
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(mail_jobs)")}
+            for column, statement in MIGRATIONS:
+                if column not in columns:
+                    conn.execute(statement)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, recipient, subject, body, attachment=None, filename=None):
+        """Store a message for delivery and return its job id.
+
+        Raises RateLimitExceeded if the recipient already has
+        per_recipient_limit messages within the last rate_window seconds.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (recent,) = conn.execute(
+                "SELECT COUNT(*) FROM mail_jobs WHERE recipient = ? AND created_at > ?",
+                (recipient.lower(), now - self.rate_window),
+            ).fetchone()
+            if recent >= self.per_recipient_limit:
+                conn.execute("ROLLBACK")
+                raise RateLimitExceeded(recipient)
+            cur = conn.execute(
+                "INSERT INTO mail_jobs (recipient, subject, body, attachment, filename, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (recipient.lower(), subject, body, attachment, filename, now, now),
+            )
+            conn.execute("COMMIT")
+            return cur.lastrowid
+
+    def claim_due(self, worker_id, limit=20):
+        """Lease up to limit due jobs to worker_id as 'sending' and return them.
+
+        Jobs whose lease expired are claimed again, ahead of queued ones.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, recipient, subject, body, attachment, filename, attempts FROM mail_jobs"
+                " WHERE (status = 'queued' AND next_attempt_at <= ?)"
+                " OR (status = 'sending' AND (claimed_at IS NULL OR claimed_at <= ?))"
+                " ORDER BY status = 'queued', next_attempt_at LIMIT ?",
+                (now, now - self.lease_seconds, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE mail_jobs SET status = 'sending', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                [(worker_id, now, r[0]) for r in rows],
+            )
+            conn.execute("COMMIT")
+        keys = ("id", "recipient", "subject", "body", "attachment", "filename", "attempts")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def mark_sent(self, job_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE mail_jobs SET status = 'sent', attachment = NULL WHERE id = ?", (job_id,))
+
+    def mark_failed(self, job_id, error, retry_at=None):
+        """Reschedule a failed job, or give up on it when retry_at is None."""
+        with self._connect() as conn:
+            if retry_at is None:
+                conn.execute(
+                    "UPDATE mail_jobs SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                    (error, job_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE mail_jobs SET status = 'queued', attempts = attempts + 1, last_error = ?,"
+                    " next_attempt_at = ? WHERE id = ?",
+                    (error, retry_at, job_id),
+                )
+
+    def counts(self):
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM mail_jobs GROUP BY status").fetchall())
+
+
+# ——— Delivery Worker ———
+class MailWorker:
+    """Background thread draining a MailQueue over one reused SMTP connection.
+
+    Failed sends are retried with exponential backoff plus jitter, up to
+    max_attempts; a job that can't be sent at all (e.g. a malformed
+    address) fails at once without stopping the worker. The connection is dropped after idle_timeout seconds
+    without work, so a burst of messages shares a single TLS handshake.
+    """
+
+    def __init__(self, queue, settings, max_attempts=5, base_backoff=30, max_backoff=3600,
+                 poll_interval=5, idle_timeout=60):
+        self.queue = queue
+        self.settings = settings
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self._smtp = None
+        self._last_used = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="mail-worker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._disconnect()
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll."""
+        self._wake.set()
+
+    def enqueue(self, recipient, subject, body, attachment=None, filename=None):
+        job_id = self.queue.enqueue(recipient, subject, body, attachment, filename)
+        self.notify()
+        return job_id
+
+    def _connection(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+        s = self.settings
+        smtp_cls = smtplib.SMTP_SSL if s.use_ssl else smtplib.SMTP
+        self._smtp = smtp_cls(s.host, s.port, timeout=s.timeout)
+        if s.username:
+            self._smtp.login(s.username, s.password)
+        return self._smtp
+
+    def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _message(self, job):
+        msg = EmailMessage()
+        msg["Subject"] = job["subject"]
+        msg["From"] = self.settings.sender
+        msg["To"] = job["recipient"]
+        msg.set_content(job["body"])
+        if job["attachment"] is not None:
+            msg.add_attachment(job["attachment"], maintype="application", subtype="pdf",
+                               filename=job["filename"] or "attachment.pdf")
+        return msg
+
+    def _send(self, job):
+        try:
+            with span("smtp.send"):
+                self._connection().send_message(self._message(job))
+        except (smtplib.SMTPException, OSError) as e:
+            self._disconnect()
+            attempts = job["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self.queue.mark_failed(job["id"], str(e))
+            else:
+                delay = min(self.base_backoff * 2 ** job["attempts"], self.max_backoff)
+                self.queue.mark_failed(job["id"], str(e), time.time() + delay * random.uniform(0.8, 1.2))
+        except Exception as e:  # not a delivery problem, so retrying won't help
+            self._disconnect()
+            self.queue.mark_failed(job["id"], f"{type(e).__name__}: {e}")
+        else:
+            self.queue.mark_sent(job["id"])
+        self._last_used = time.time()
+
+    def run_once(self):
+        """Send every job that is due now; returns how many were attempted."""
+        jobs = self.queue.claim_due(self.worker_id)
+        for job in jobs:
+            self._send(job)
+        return len(jobs)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception:  # e.g. the outbox is locked; try again next poll
+                worked = 0
+            if not worked:
+                if self._smtp is not None and time.time() - self._last_used > self.idle_timeout:
+                    self._disconnect()
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
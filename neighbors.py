@@ -0,0 +1,103 @@
+import numpy as np
+
+from filters import category_mask
+
+
+# ——— Closest Twins ———
+# Distance = sum of weighted terms, each >= 0:
+#   gpa, score  |difference| in standard deviations of the dataset
+#   ethnicity   1 when the category differs from the user's
+#   gender      1 when the category differs from the user's
+#   ecs         share of the user's EC keywords missing from the post
+DEFAULT_WEIGHTS = {"gpa": 1.0, "score": 1.0, "ethnicity": 0.5, "gender": 0.25, "ecs": 1.0}
+
+# Search radius in distance units: starts small and doubles until top-k is
+# exact, falling back to scoring every row past MAX_RADIUS.
+INITIAL_RADIUS = 0.25
+MAX_RADIUS = 64.0
+
+
+def feature_scales(score_index):
+    """Standard deviations of GPA and unified score over the indexed rows."""
+    return float(np.nanstd(score_index.gpa)) or 1.0, float(np.nanstd(score_index.score)) or 1.0
+
+
+def twin_distances(ds, rows, gpa, score, eth, gen, keywords, weights):
+    """Weighted distance from the user to each (ascending) row position in rows."""
+    df = ds.frame
+    gpa_scale, score_scale = ds.feature_scales
+    distance = np.zeros(len(rows))
+    if gpa is not None:
+        distance += weights["gpa"] * np.abs(ds.score_index.gpa[rows] - gpa) / gpa_scale
+    if score is not None:
+        distance += weights["score"] * np.abs(ds.score_index.score[rows] - score) / score_scale
+    if eth != "No filter":
+        distance += weights["ethnicity"] * ~category_mask(df['Eth_norm'], eth.lower(), rows)
+    if gen != "No filter":
+        distance += weights["gender"] * ~category_mask(df['Gen_norm'], gen.lower(), rows)
+
+    if keywords:
+        # rows is ascending, so membership in each keyword's sorted postings
+        # is one searchsorted per keyword
+        found = np.zeros(len(rows))
+        for kw in set(keywords):
+            postings = ds.ec_index.rows_for(kw, None)
+            if len(postings):
+                where = np.minimum(np.searchsorted(postings, rows), len(postings) - 1)
+                found += postings[where] == rows
+        distance += weights["ecs"] * (1 - found / len(set(keywords)))
+    # Rows missing a stat the user gave have no meaningful distance
+    return np.nan_to_num(distance, nan=np.inf)
+
+
+def closest_twins(ds, gpa, sat, act, eth, gen, keywords=(), k=25, weights=None):
+    """The k profiles nearest to the user, as (rows, distances, EC hits).
+
+    Only profiles with acceptances, and with the stats the user gave, are
+    considered. Rows come back nearest first.
+
+    The GPA and score terms alone bound the distance from below, so every
+    row outside a ScoreIndex window of radius r is farther than r. Searching
+    windows of growing radius, and stopping once k rows lie within it, gives
+    the exact top-k while scoring only the neighbourhood of the user.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    score = sat if sat is not None else (act * 45 if act is not None else None)
+    gpa_scale, score_scale = ds.feature_scales
+    has_acc = ds.frame['has_acc'].to_numpy()
+
+    radius = INITIAL_RADIUS
+    while True:
+        gpa_window = score_window = None
+        if gpa is not None and weights["gpa"] > 0:
+            half = radius * gpa_scale / weights["gpa"]
+            gpa_window = (gpa - half, gpa + half)
+        if score is not None and weights["score"] > 0:
+            half = radius * score_scale / weights["score"]
+            score_window = (score - half, score + half)
+        # Scoring a row costs more than masking one, so take the index's
+        # rows even for wide windows
+        rows = ds.score_index.candidates(gpa_window, score_window, max_fraction=1.0)
+        exhaustive = rows is None or radius > MAX_RADIUS
+        if exhaustive:
+            rows = np.arange(len(ds))
+        rows = rows[has_acc[rows]]
+
+        distance = twin_distances(ds, rows, gpa, score, eth, gen, keywords, weights)
+        inside = np.flatnonzero(distance <= (np.inf if exhaustive else radius))
+        if exhaustive or len(inside) >= k:
+            break
+        radius *= 2
+
+    inside = inside[np.isfinite(distance[inside])]
+    if len(inside) > k:
+        inside = inside[np.argpartition(distance[inside], k - 1)[:k]]
+    inside = inside[np.argsort(distance[inside], kind="stable")]
+    twins = rows[inside]
+
+    hits = [[] for _ in range(len(twins))]
+    if keywords:
+        matched, matched_hits = ds.ec_index.match(keywords, min_hits=1, rows=twins)
+        by_row = dict(zip(matched.tolist(), matched_hits))
+        hits = [by_row.get(r, []) for r in twins.tolist()]
+    return twins, distance[inside], hits
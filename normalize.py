@@ -0,0 +1,104 @@
+import re
+import string
+
+import pandas as pd
+
+
+# ——— Stopwords & Keyword Extraction ———
+STOPWORDS = {
+    "a","an","the","and","or","but","if","then","with","on","in",
+    "at","by","for","of","to","from","is","are","was","were","it",
+    "this","that","these","those","as","be","has","have","had","i",
+    "you","he","she","we","they","them","his","her","my","your",
+}
+
+def extract_keywords(text):
+    text = text.translate(str.maketrans("", "", string.punctuation))
+    tokens = text.lower().split()
+    return [t for t in tokens if t not in STOPWORDS]
+
+# ——— Normalization Helpers ———
+def normalize_ethnicity(ethnicity):
+    if pd.isna(ethnicity):
+        return "unknown"
+    e = ethnicity.lower()
+    if any(x in e for x in ["indian","south asian","asian"]):
+        return "asian"
+    if "white" in e or "caucasian" in e:
+        return "white"
+    if "black" in e or "african" in e:
+        return "black"
+    if "hispanic" in e or "latino" in e or "latina" in e or "latinx" in e:
+        return "hispanic"
+    if "native american" in e or "indigenous" in e:
+        return "native american"
+    if "middle eastern" in e or "arab" in e:
+        return "middle eastern"
+    return "other"
+
+def normalize_gender(gender):
+    if pd.isna(gender):
+        return "unknown"
+    g = str(gender).strip().lower()
+    if g in ['male','m']:
+        return 'male'
+    if g in ['female','f']:
+        return 'female'
+    return 'unknown'
+
+def clean_acceptances(raw):
+    if pd.isna(raw) or not raw.strip():
+        return ""
+    parts = re.split(r"[\n,]+", raw)
+    bad_kw = {
+        "club","volunteer","internship","hook","income","essay",
+        "activity","award","reflection","summary","miscellaneous",
+        "consideration","recommendation","research","grades"
+    }
+    school_kw = {
+        "university","college","institute","state","academy","school",
+        "tech","polytechnic","poly","mit","stanford","harvard","princeton","yale"
+    }
+    good = []
+    for p in parts:
+        pl = p.strip().lower()
+        if not pl or any(b in pl for b in bad_kw):
+            continue
+        if any(s in pl for s in school_kw) or pl in {"ea","ed","rea","rd"} or len(pl.split())<=8:
+            good.append(p.strip())
+    joined = ", ".join(good)
+    return joined if len(joined)<=250 else ""
+
+def normalize_residency(residency):
+    if pd.isna(residency):
+        return "other"
+    r = residency.lower()
+    if "domestic" in r:
+        return "domestic"
+    if "international" in r:
+        return "international"
+    return "other"
+
+def extract_clean_colleges(raw):
+    if not isinstance(raw, str) or not raw.strip():
+        return []
+    parts = re.split(r"[\n,]+", raw)
+    indicators = [
+        "university", "college", "institute", "school",
+        "academy", "tech", "polytechnic", "poly", "mit",
+        "stanford", "harvard", "princeton", "yale"
+    ]
+    cleaned = []
+    for p in parts:
+        seg = p.strip()
+        if not seg:
+            continue
+        name = seg.split("(", 1)[0].strip()
+        low = name.lower()
+        if any(ind in low for ind in indicators):
+            cleaned.append(name[:100])
+    return cleaned
+
+def unified_sat(df):
+    """SAT score where reported, otherwise ACT * 45."""
+    return df['SAT_Score'].where(df['SAT_Score'].notna(), df['ACT_Score'] * 45)
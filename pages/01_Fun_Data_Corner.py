@@ -1,127 +1,124 @@
+import os
+
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from aggregates import SCORE_LABELS, density_grid, race_aggregates, school_points
+from data_loader import load_data, load_dataset, refresh_data
 
 st.set_page_config(page_title="Fun Data Corner", layout="wide")
 
 @st.cache_data
-def load_and_prepare_data():
-    df = pd.read_csv("https://drive.google.com/uc?export=download&id=1nZtwYcUX_KraxOTAOLg6-ZvKZnKMNpSg")
-
-    # Normalize into four racial groups
-    def norm_race(e):
-        if pd.isna(e): return None
-        e = e.lower()
-        if any(x in e for x in ["indian","south asian","asian"]): return "Asian"
-        if "white" in e or "caucasian" in e: return "White"
-        if "black" in e or "african" in e: return "Black"
-        if any(x in e for x in ["hispanic","latino","latina","latinx"]): return "Hispanic"
-        return None
-
-    df['RaceNorm'] = df['Ethnicity'].apply(norm_race)
-
-    # Unified SAT score (SAT or ACT*45)
-    df['SAT_Adjusted'] = df.apply(
-        lambda r: r['SAT_Score']
-                  if pd.notna(r['SAT_Score'])
-                  else (r['ACT_Score'] * 45 if pd.notna(r['ACT_Score']) else None),
-        axis=1
-    )
-
-    # Keep only chosen races & scores 1100–1600
-    df = df.dropna(subset=['RaceNorm','SAT_Adjusted'])
-    df = df[(df['SAT_Adjusted'] >= 1100) & (df['SAT_Adjusted'] <= 1600)]
-
-    # GPA and acceptances for Ivy League scatter plots
-    df_gpa = df[['GPA', 'acceptances', 'SAT_Score', 'ACT_Score']].copy()
-    df_gpa = df_gpa.dropna(subset=['GPA', 'acceptances'])
-    
-    # Calculate combined SAT/ACT score again for scatter plot, to be safe
-    df_gpa['SAT_Adjusted'] = df_gpa.apply(
-        lambda r: r['SAT_Score']
-                  if pd.notna(r['SAT_Score'])
-                  else (r['ACT_Score'] * 45 if pd.notna(r['ACT_Score']) else None),
-        axis=1
-    )
-    df_gpa = df_gpa.dropna(subset=['SAT_Adjusted'])
-    
-    return df, df_gpa
-
-def plot_box(df):
-    fig = px.box(
-        df,
-        x='RaceNorm',
-        y='SAT_Adjusted',
-        color='RaceNorm',
-        labels={'RaceNorm':'Race','SAT_Adjusted':'SAT Score'},
+def load_and_prepare_data(version):
+    # version only keys the cache; the frame itself is shared with app.py and
+    # is only read here. SAT_Adjusted and Eth_norm are computed at ingest.
+    return race_aggregates(load_data())
+
+# Above this many points the per-school chart becomes a density heatmap
+SCATTER_POINT_LIMIT = int(os.environ.get("MATCHMYAPP_SCATTER_POINTS", 2000))
+
+RACE_COLORS = {"Asian":"#636EFA","White":"#EF553B","Black":"#00CC96","Hispanic":"#AB63FA"}
+
+def plot_box(box):
+    # Boxes drawn from precomputed quartiles; no per-profile points are sent
+    fig = go.Figure()
+    for race, s in box.iterrows():
+        fig.add_trace(go.Box(
+            x=[race], name=race, marker_color=RACE_COLORS[race],
+            q1=[s['q1']], median=[s['median']], q3=[s['q3']],
+            lowerfence=[s['lowerfence']], upperfence=[s['upperfence']], mean=[s['mean']],
+        ))
+    fig.update_layout(
         title="SAT Score Distribution by Race (1100–1600)",
-        color_discrete_map={
-            "Asian":"#636EFA","White":"#EF553B",
-            "Black":"#00CC96","Hispanic":"#AB63FA"
-        }
+        xaxis_title="Race", yaxis_title="SAT Score", showlegend=False,
     )
-    fig.update_traces(boxmean=True)
-    fig.update_layout(showlegend=False)
     st.plotly_chart(fig, use_container_width=True)
 
-def plot_within_race(df):
-    # Buckets
-    bins = list(range(1100,1601,50))
-    labels = [f"{b}-{b+49}" for b in bins[:-1]]
-    df['Score_Bucket'] = pd.cut(df['SAT_Adjusted'], bins=bins, labels=labels, right=False)
-
-    # Count & percent within each race
-    counts = (
-        df.groupby(['RaceNorm','Score_Bucket'])
-          .size()
-          .reset_index(name='Count')
-    )
-    counts['TotalByRace'] = counts.groupby('RaceNorm')['Count'].transform('sum')
-    counts['Percent'] = counts['Count'] / counts['TotalByRace'] * 100
-
+def plot_within_race(counts):
     fig = px.bar(
         counts,
         x='Score_Bucket',
         y='Percent',
         color='RaceNorm',
         barmode='group',
-        category_orders={'Score_Bucket': labels},
+        category_orders={'Score_Bucket': SCORE_LABELS},
         labels={'Score_Bucket':'SAT Score Range','Percent':'% within Race','RaceNorm':'Race'},
         title="Within‑Race SAT Distribution (1100–1600)"
     )
     fig.update_layout(xaxis_tickangle=-45, legend_title_text="Race", yaxis_ticksuffix="%")
     st.plotly_chart(fig, use_container_width=True)
 
-def get_ivy_school_data(df_gpa, school_name):
-    accepted = df_gpa[df_gpa['acceptances'].str.contains(school_name, case=False, na=False)]
-    ivy_gpa_data = []
-    for _, row in accepted.iterrows():
-        ivy_gpa_data.append({
-            'GPA': row['GPA'],
-            'SAT_ACT_Score': row['SAT_Adjusted']
-        })
-    return pd.DataFrame(ivy_gpa_data)
-
-def plot_ivy_scatter_single(df_school, school_name):
-    if df_school.empty:
+def plot_ivy_scatter_single(gpa, score, school_name):
+    if not len(gpa):
         st.write(f"No GPA and test score data found for {school_name} acceptances.")
         return
-    
-    fig = px.scatter(
-        df_school,
-        x='GPA',
-        y='SAT_ACT_Score',
-        labels={
-            'GPA': 'GPA (3.0 - 4.0 scale)',
-            'SAT_ACT_Score': 'Unified SAT/ACT Score'
-        },
-        title=f"GPA vs. SAT/ACT Scores of Students Accepted to {school_name}",
-        color_discrete_sequence=["#636EFA"]
-    )
+
+    title = f"GPA vs. SAT/ACT Scores of Students Accepted to {school_name}"
+    axis_labels = {'x': 'GPA (3.0 - 4.0 scale)', 'y': 'Unified SAT/ACT Score'}
+    if len(gpa) <= SCATTER_POINT_LIMIT:
+        fig = px.scatter(x=gpa, y=score, labels=axis_labels, title=title, color_discrete_sequence=["#636EFA"])
+    else:
+        # Binned server-side: the browser gets a fixed-size grid, not every point
+        counts, gpa_centers, score_centers = density_grid(gpa, score)
+        fig = go.Figure(go.Heatmap(
+            z=counts, x=gpa_centers, y=score_centers,
+            colorscale="Blues", colorbar={"title": "Profiles"},
+        ))
+        fig.update_layout(title=title, xaxis_title=axis_labels['x'], yaxis_title=axis_labels['y'])
     fig.update_xaxes(range=[3.0, 4.0])
     fig.update_yaxes(range=[1100, 1600])
     st.plotly_chart(fig, use_container_width=True)
 
+    payload_kb = len(fig.to_json()) / 1024
+    points_col, payload_col = st.columns(2)
+    points_col.metric("Accepted profiles plotted", f"{len(gpa):,}")
+    payload_col.metric("Chart payload", f"{payload_kb:,.1f} KB")
+
+IVY_LEAGUE = [
+    "Brown University", "Columbia University", "Cornell University", "Dartmouth College",
+    "Harvard University", "University of Pennsylvania", "Princeton University", "Yale University",
+]
+
+def compare_schools(stats):
+    default = [s for s in IVY_LEAGUE if s in stats.index][:4] or list(stats.index[:4])
+    selected = st.multiselect("Schools to compare:", list(stats.index), default=default)
+    if not selected:
+        st.info("Pick one or more schools to compare.")
+        return
+
+    table = stats.loc[selected]
+    st.dataframe(
+        table.style.format({c: "{:.2f}" for c in table.columns if c.startswith("GPA")}
+                           | {c: "{:.0f}" for c in table.columns if c.startswith("Score")}
+                           | {c: "{:.1f}%" for c in table.columns if c.startswith("%")}),
+        use_container_width=True,
+    )
+
+    # Medians with interquartile ranges, drawn from the table alone
+    fig = go.Figure()
+    for col, axis in (("GPA", "y"), ("Score", "y2")):
+        fig.add_trace(go.Scatter(
+            x=selected, y=table[f"{col} median"], name=f"{col} median", mode="markers", yaxis=axis,
+            error_y={"type": "data", "symmetric": False,
+                     "array": table[f"{col} 75th"] - table[f"{col} median"],
+                     "arrayminus": table[f"{col} median"] - table[f"{col} 25th"]},
+        ))
+    fig.update_layout(
+        title="Median GPA and SAT/ACT of Admits (bars span the 25th–75th percentile)",
+        yaxis={"title": "GPA"}, yaxis2={"title": "Unified SAT/ACT", "overlaying": "y", "side": "right"},
+        legend={"orientation": "h"},
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    mix = table[[c for c in table.columns if c.startswith("% ") and c not in ("% Female", "% Male")]]
+    fig = px.bar(
+        mix.reset_index().melt(id_vars="School", var_name="Group", value_name="Percent"),
+        x="School", y="Percent", color="Group", barmode="stack",
+        title="Ethnicity Mix of Admits", labels={"Percent": "% of admits"},
+    )
+    fig.update_layout(yaxis_ticksuffix="%")
+    st.plotly_chart(fig, use_container_width=True)
+
 def main():
     st.title("🎲 Fun Data Corner")
     
@@ -133,7 +130,10 @@ def main():
     
     # 1. SAT Scores Visualization
     st.subheader("1. Race and Standardized Test Scores")
-    df, df_gpa = load_and_prepare_data()
+    if st.sidebar.button("🔄 Refresh data"):
+        refresh_data()
+    ds = load_dataset()
+    aggregates = load_and_prepare_data(ds.version)
 
     with st.expander("▶️ SAT Visualization Options", expanded=False):
         sat_mode = st.radio(
@@ -143,28 +143,24 @@ def main():
 
     if sat_mode == "Box‑Plot Distribution":
         with st.expander("▶️ Box‑Plot of SAT Scores by Race", expanded=False):
-            plot_box(df)
+            plot_box(aggregates["box"])
     else:
         st.subheader("Percentage Histogram Within Each Race")
-        plot_within_race(df)
+        plot_within_race(aggregates["buckets"])
         
-    # 2. Ivy League GPA vs SAT/ACT Separate Scatter Plots
-    st.subheader("2. Ivy League GPA vs. SAT/ACT Scores of Accepted Students")
-
-    ivy_schools = [
-        'Brown',
-        'Columbia',
-        'Cornell',
-        'Dartmouth',
-        'Harvard',
-        'Penn',
-        'Princeton',
-        'Yale'
-    ]
-    
-    selected_school = st.selectbox("Select Ivy League School:", ivy_schools)
-    df_school = get_ivy_school_data(df_gpa, selected_school)
-    plot_ivy_scatter_single(df_school, selected_school)
+    # 2. GPA vs SAT/ACT scatter for any school in the dataset
+    st.subheader("2. GPA vs. SAT/ACT Scores of Accepted Students")
+    stats = ds.school_stats.sort_values("Acceptances", ascending=False)
+    schools = list(stats.index)
+
+    default = schools.index("Harvard University") if "Harvard University" in schools else 0
+    selected_school = st.selectbox("Select a school (type to search):", schools, index=default)
+    gpa, score = school_points(ds, selected_school)
+    plot_ivy_scatter_single(gpa, score, selected_school)
+
+    # 3. Side-by-side statistics from the per-school table
+    st.subheader("3. Compare Schools")
+    compare_schools(stats)
 
 if __name__=="__main__":
     main()
@@ -0,0 +1,157 @@
+import cProfile
+import html
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# ——— On-demand Capture ———
+# Nothing here runs unless a capture is requested: the app checks a query
+# parameter / session flag and only then wraps the rerun in capture().
+MAX_PROFILES = 20
+HTML_TOP_FUNCTIONS = 60
+
+# cProfile hooks the interpreter for the whole process, so only one
+# session can be profiled at a time
+_capture_lock = threading.Lock()
+# The capture running on this script thread, if any, for note_inputs()
+_active = threading.local()
+
+
+class Capture:
+    """One profiled rerun: identity, timing and the inputs it saw."""
+
+    def __init__(self, label):
+        self.id = datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.label = label
+        self.started_at = time.time()
+        self.seconds = None
+        self.inputs = {}
+        self.paths = {}
+
+    def meta(self):
+        return {
+            "id": self.id, "label": self.label, "started_at": self.started_at,
+            "seconds": self.seconds, "inputs": self.inputs,
+        }
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(v) for v in value]
+    return str(value)
+
+
+def note_inputs(section, **values):
+    """Record the inputs of section on the running capture; free when idle."""
+    capture = getattr(_active, "capture", None)
+    if capture is not None:
+        capture.inputs[section] = {k: _jsonable(v) for k, v in values.items()}
+
+
+@contextmanager
+def capture(directory, label=""):
+    """Profile the enclosed block and save it under directory.
+
+    Yields the Capture, or None when another session is already being
+    profiled (the block then runs unprofiled). Files are written even if
+    the block raises, e.g. on st.rerun().
+    """
+    if not _capture_lock.acquire(blocking=False):
+        yield None
+        return
+    cap = Capture(label)
+    profiler = cProfile.Profile()
+    _active.capture = cap
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        yield cap
+    finally:
+        profiler.disable()
+        cap.seconds = time.perf_counter() - start
+        _active.capture = None
+        _capture_lock.release()
+        save(cap, profiler, directory)
+
+
+# ——— Artifacts ———
+def save(cap, profiler, directory):
+    """Write <id>.prof, <id>.html and <id>.json, dropping the oldest past MAX_PROFILES."""
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, cap.id)
+    cap.paths = {"prof": base + ".prof", "html": base + ".html", "json": base + ".json"}
+    profiler.dump_stats(cap.paths["prof"])
+    with open(cap.paths["html"], "w", encoding="utf-8") as f:
+        f.write(render_html(pstats.Stats(profiler), cap))
+    with open(cap.paths["json"], "w", encoding="utf-8") as f:
+        json.dump(cap.meta(), f, indent=2)
+    for old in list_profiles(directory)[MAX_PROFILES:]:
+        for path in old["paths"].values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def list_profiles(directory):
+    """Saved captures, newest first, as their JSON metadata plus file paths."""
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        base = os.path.join(directory, name[:-len(".json")])
+        try:
+            with open(base + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta["paths"] = {ext: f"{base}.{ext}" for ext in ("prof", "html", "json") if os.path.exists(f"{base}.{ext}")}
+        out.append(meta)
+    return out
+
+
+def render_html(stats, cap, top=HTML_TOP_FUNCTIONS):
+    """A standalone page: the inputs, then the top functions by cumulative time."""
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_stats(top)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _) in sorted(
+        stats.stats.items(), key=lambda item: -item[1][3],
+    )[:top]:
+        rows.append(
+            f"<tr><td>{nc}</td><td>{tt * 1000:.1f}</td><td>{ct * 1000:.1f}</td>"
+            f"<td>{html.escape(func)}</td><td>{html.escape(filename)}:{line}</td></tr>"
+        )
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Profile {cap.id}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 13px; }}
+td, th {{ border-bottom: 1px solid #ddd; padding: 3px 8px; text-align: left; }}
+td:nth-child(-n+3) {{ text-align: right; font-variant-numeric: tabular-nums; }}
+pre {{ background: #f6f6f6; padding: 1em; }}
+</style></head><body>
+<h1>Profile {cap.id}</h1>
+<p>{html.escape(cap.label)} — {cap.seconds:.3f} s, started {datetime.fromtimestamp(cap.started_at):%Y-%m-%d %H:%M:%S}</p>
+<h2>Inputs</h2>
+<pre>{html.escape(json.dumps(cap.inputs, indent=2))}</pre>
+<h2>Top {top} functions by cumulative time</h2>
+<table><tr><th>calls</th><th>own ms</th><th>cumulative ms</th><th>function</th><th>location</th></tr>
+{"".join(rows)}
+</table>
+<h2>pstats output</h2>
+<pre>{html.escape(text.getvalue())}</pre>
+</body></html>
+"""
@@ -0,0 +1,174 @@
+import io
+import os
+import textwrap
+import threading
+from datetime import datetime
+from functools import lru_cache
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+
+# ——— Static Content ———
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "logo.png")
+LOGO_SIZE = 100
+# Embedded at 2x the drawn size; the 500x500 source cost more to encode
+# than the rest of the report
+LOGO_PIXELS = 2 * LOGO_SIZE
+RIGHT_MARGIN = 40
+TOP_MARGIN = 50
+BOTTOM_MARGIN = 80
+
+NOTES = [
+    "These colleges were suggested to you because past applicants with similar profiles and interests got into them. When building your college list, please make sure to consider a range of factors, including your class size preferences, location, campus culture, sports culture, and financial aid.",
+    "Also, note that most of the top schools are committed to meeting your full demonstrated need, but do your research since there are a few exceptions!",
+    "If you found this helpful, do share our app with a friend to spread the joy of college application preparation!",
+]
+
+
+@lru_cache(maxsize=None)
+def _logo(path=LOGO_PATH, pixels=LOGO_PIXELS):
+    """The logo, decoded and downscaled once per process, reused by every document."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return ImageReader(image.convert("RGBA").resize((pixels, pixels), Image.LANCZOS))
+
+
+@lru_cache(maxsize=None)
+def _notes_layout():
+    """Pre-wrapped notes as (line, y offset) pairs plus the block height."""
+    lines, dy = [], 0
+    for i, paragraph in enumerate(NOTES):
+        if i:
+            dy += 5  # blank line between paragraphs
+        for line in textwrap.wrap(paragraph, width=110):
+            lines.append((line, dy))
+            dy += 15
+        dy += 5
+    return tuple(lines), dy
+
+
+# ——— College List Report ———
+# rl_config is process-wide, so renders take turns changing it
+_render_lock = threading.Lock()
+
+
+def render_college_list(inputs, schools, profiles, generated_at=None):
+    """Draw the College List Wizard PDF and return its bytes.
+
+    inputs are (label, value) pairs, schools are (name, acceptances, example
+    URLs) triples in display order, and profiles are (url, summary) pairs.
+    """
+    # Streams are written as plain deflate rather than ASCII85 text: without
+    # the optional rl_accel extension reportlab encodes ASCII85 in pure
+    # Python, which cost more than the rest of the report. The setting is
+    # restored afterwards so other PDFs in the process keep the default.
+    with _render_lock:
+        use_a85, rl_config.useA85 = rl_config.useA85, 0
+        try:
+            return _draw_college_list(inputs, schools, profiles, generated_at)
+        finally:
+            rl_config.useA85 = use_a85
+
+
+def _draw_college_list(inputs, schools, profiles, generated_at):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    c.drawImage(_logo(), width - RIGHT_MARGIN - LOGO_SIZE, height - TOP_MARGIN - LOGO_SIZE,
+                width=LOGO_SIZE, height=LOGO_SIZE, mask="auto")
+
+    # Title and Timestamp
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(40, height - 50, "MatchMyApp - Personalized College List")
+    c.setFont("Helvetica", 10)
+    c.drawString(40, height - 70, "Generated on: " + (generated_at or datetime.now()).strftime("%Y-%m-%d %H:%M:%S"))
+
+    y = height - 100
+
+    # User inputs - including ECs
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "📌 Your Inputs")
+    y -= 20
+    c.setFont("Helvetica", 10)
+    for label, value in inputs:
+        for line in textwrap.wrap(f"{label}: {value}", width=90):
+            c.drawString(50, y, line)
+            y -= 15
+    y -= 20
+
+    # Matched Colleges
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "🎯 Matched Colleges")
+    y -= 25
+    for name, count, urls in schools:
+        c.setFillColorRGB(0, 0, 0.5)  # dark blue
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(50, y, name)
+
+        c.setFillColorRGB(0, 0, 0)
+        c.setFont("Helvetica", 11)
+        c.drawString(50 + c.stringWidth(name, "Helvetica-Bold", 12), y, f" — {count} acceptance(s)")
+
+        c.setFont("Helvetica-Oblique", 9)
+        c.setFillColorRGB(0, 0, 1)  # blue for link
+        for url in urls:
+            y -= 15
+            link = "Reddit: " + url
+            c.drawString(60, y, link)
+            c.linkURL(url, (60, y - 2, 60 + c.stringWidth(link, "Helvetica-Oblique", 9), y + 10), relative=0)
+
+        y -= 25
+        c.setFillColorRGB(0, 0, 0)
+        if y < BOTTOM_MARGIN:
+            c.showPage()
+            y = height - 50
+
+    # Profiles Like Yours
+    y -= 10
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "🧠 Profiles Like Yours")
+    y -= 25
+    c.setFont("Helvetica", 9)
+    if not profiles:
+        c.drawString(50, y, "No Reddit posts available after applying your filters.")
+        y -= 20
+    for url, summary in profiles:
+        c.setFillColorRGB(0, 0, 1)
+        c.drawString(50, y, url)
+        c.linkURL(url, (50, y - 2, 50 + c.stringWidth(url, "Helvetica", 9), y + 10), relative=0)
+        y -= 12
+
+        c.setFillColorRGB(0, 0, 0)
+        for line in textwrap.wrap(summary, width=110):
+            c.drawString(50, y, line)
+            y -= 12
+
+        y -= 15
+        if y < BOTTOM_MARGIN:
+            c.showPage()
+            y = height - 50
+            c.setFont("Helvetica", 9)
+
+    # Notes, drawn as one text object from the pre-wrapped lines
+    notes, notes_height = _notes_layout()
+    y -= 10
+    if y - 25 - notes_height < 40:
+        c.showPage()
+        y = height - 50
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(40, y, "💡 Notes")
+    y -= 25
+    text = c.beginText()
+    text.setFont("Helvetica", 11)
+    for line, dy in notes:
+        text.setTextOrigin(50, y - dy)
+        text.textOut(line)
+    c.drawText(text)
+
+    c.save()
+    return buffer.getvalue()
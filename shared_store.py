@@ -0,0 +1,186 @@
+import fcntl
+import json
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from dataset import INDEXES, Dataset
+from ingest import read_snapshot, write_snapshot
+
+
+# ——— Layout ———
+# One directory shared by every server process on the box:
+#
+#   CURRENT               JSON pointer to the live generation, swapped atomically
+#   .lock                 serializes publishers
+#   gen-000007/
+#       frame.arrow       the prepared frame, uncompressed Arrow IPC
+#       indexes.pkl       the built indexes, with every NumPy array replaced
+#       arrays/<n>.npy    by a reference to one of these raw array files
+#       meta.json         version, source key and publish time
+#
+# Attaching memory-maps the files, so the page cache holds one copy of the
+# data no matter how many processes read it. Only small pieces are private
+# to each process: categorical codes, nullable float columns and Python
+# objects such as vocabularies.
+POINTER_NAME = "CURRENT"
+LOCK_NAME = ".lock"
+FRAME_NAME = "frame.arrow"
+INDEXES_NAME = "indexes.pkl"
+ARRAYS_DIR = "arrays"
+META_NAME = "meta.json"
+
+# Older generations are deleted once this many newer ones exist; processes
+# still mapping a deleted generation keep it alive until they swap
+KEEP_GENERATIONS = 2
+
+
+def _generation_dir(root, generation):
+    return os.path.join(root, f"gen-{generation:06d}")
+
+
+def current(root):
+    """The live generation's metadata, or None if nothing is published yet."""
+    try:
+        with open(os.path.join(root, POINTER_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def publish_lock(root):
+    """Exclusive lock across processes; hold it to check-then-publish."""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_NAME), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# ——— Index Arrays ———
+class _ArrayPickler(pickle.Pickler):
+    # Numeric arrays go to their own .npy file; everything else is pickled
+    def __init__(self, f, array_dir):
+        super().__init__(f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.array_dir = array_dir
+        self.saved = 0
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray or isinstance(obj, np.memmap):
+            if obj.dtype.hasobject:
+                return None
+            name = f"{self.saved}.npy"
+            np.save(os.path.join(self.array_dir, name), np.ascontiguousarray(obj))
+            self.saved += 1
+            return name
+        return None
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, f, array_dir):
+        super().__init__(f)
+        self.array_dir = array_dir
+
+    def persistent_load(self, name):
+        # A plain (read-only) ndarray view, so results of index operations
+        # don't come back as np.memmap
+        return np.load(os.path.join(self.array_dir, name), mmap_mode="r").view(np.ndarray)
+
+
+# ——— Publish / Attach ———
+def publish(root, ds, key=None):
+    """Write ds and all of its indexes as a new generation and make it current.
+
+    key is any JSON value describing where the data came from; readers use
+    it to decide whether they already have the newest data. Returns the new
+    generation's metadata. Call under publish_lock() when several processes
+    may publish.
+    """
+    for name in INDEXES:
+        getattr(ds, name)  # build anything not built yet
+
+    os.makedirs(root, exist_ok=True)
+    live = current(root)
+    generation = (live["generation"] + 1) if live else 1
+    while os.path.exists(_generation_dir(root, generation)):
+        generation += 1
+
+    final = _generation_dir(root, generation)
+    tmp = f"{final}.tmp-{os.getpid()}"
+    os.makedirs(os.path.join(tmp, ARRAYS_DIR))
+    write_snapshot(ds.frame, os.path.join(tmp, FRAME_NAME))
+    with open(os.path.join(tmp, INDEXES_NAME), "wb") as f:
+        _ArrayPickler(f, os.path.join(tmp, ARRAYS_DIR)).dump({name: ds.__dict__[name] for name in INDEXES})
+    meta = {
+        "generation": generation,
+        "dir": os.path.basename(final),
+        "version": ds.version,
+        "key": key,
+        "profiles": len(ds),
+        "published_at": time.time(),
+    }
+    with open(os.path.join(tmp, META_NAME), "w") as f:
+        json.dump(meta, f)
+    os.rename(tmp, final)
+
+    # The swap: readers see either the old pointer or the new one
+    pointer = os.path.join(root, POINTER_NAME)
+    with open(f"{pointer}.tmp-{os.getpid()}", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{pointer}.tmp-{os.getpid()}", pointer)
+    prune(root)
+    return meta
+
+
+def attach(root, meta):
+    """A Dataset over the generation described by meta, memory-mapped.
+
+    Arrow string and list columns keep pointing into the mapped file;
+    index arrays are read-only views of their .npy files.
+    """
+    path = os.path.join(root, meta["dir"])
+    frame = read_snapshot(os.path.join(path, FRAME_NAME))
+    ds = Dataset(frame, meta["version"])
+    with open(os.path.join(path, INDEXES_NAME), "rb") as f:
+        ds.__dict__.update(_ArrayUnpickler(f, os.path.join(path, ARRAYS_DIR)).load())
+    return ds
+
+
+def prune(root, keep=KEEP_GENERATIONS):
+    """Delete all but the newest `keep` generations and stale temp dirs."""
+    live = current(root)
+    names = sorted(n for n in os.listdir(root) if n.startswith("gen-"))
+    finished = [n for n in names if ".tmp-" not in n]
+    doomed = finished[:-keep] if keep else finished
+    # Temp dirs of publishers that died mid-write
+    doomed += [n for n in names if ".tmp-" in n and not _pid_alive(n.rsplit("-", 1)[1])]
+    for name in doomed:
+        if live and name == live["dir"]:
+            continue
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def mapped_bytes(root, meta):
+    """Bytes of the generation's files, i.e. what every attached process shares."""
+    path = os.path.join(root, meta["dir"])
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    return total
@@ -0,0 +1,82 @@
+"""Fail when app.py's startup imports exceed an import-time budget.
+
+Runs the module-level imports of app.py in a fresh interpreter under
+`python -X importtime`, prints the slowest top-level imports, and exits
+non-zero if the total is over budget or if a dependency that is meant to
+load lazily (reportlab, fpdf, python-docx, spacy) is imported at startup.
+
+    python tools/check_import_time.py --budget-ms 1500 --runs 3
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Only features that need them may import these
+LAZY_MODULES = ("reportlab", "fpdf", "docx", "spacy")
+
+
+def startup_imports(path=APP):
+    """Source of the import statements at the top level of path."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(code):
+    """[(module, self_us, cumulative_us, depth)] from one -X importtime run."""
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        sys.exit(f"startup imports failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("MATCHMYAPP_IMPORT_BUDGET_MS", 1500)))
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest of this many cold runs")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    code = startup_imports()
+    runs = [measure(code) for _ in range(args.runs)]
+    totals = [sum(cum for _, _, cum, depth in run if depth == 0) for run in runs]
+    best = runs[totals.index(min(totals))]
+    total_ms = min(totals) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    top_level = sorted((e for e in best if e[3] == 0), key=lambda e: -e[2])
+    for name, self_us, cum_us, _ in top_level[:args.top]:
+        print(f"{cum_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+    print(f"total: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+
+    loaded = {name for name, *_ in best}
+    eager = sorted(m for m in loaded if m.split(".")[0] in LAZY_MODULES)
+    failed = False
+    if eager:
+        print(f"FAIL: lazily loaded dependencies imported at startup: {', '.join(eager[:5])}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
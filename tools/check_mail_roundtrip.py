@@ -0,0 +1,134 @@
+"""Round-trip the mail queue through a local SMTP stand-in.
+
+Starts an aiosmtpd server on localhost, enqueues messages into a fresh
+outbox and drains it with MailWorker, then checks that:
+
+- every good message arrives exactly once, with its PDF attachment,
+  over one reused SMTP connection;
+- a job that can't be turned into a message (a CR/LF in the recipient)
+  is marked failed without stopping the worker;
+- a second worker sharing the outbox doesn't take over jobs leased to
+  the first, but does pick them up once the lease expires;
+- the per-recipient rate limit holds.
+
+    pip install aiosmtpd
+    python tools/check_mail_roundtrip.py
+"""
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mailer import MailQueue, MailWorker, RateLimitExceeded, SMTPSettings  # noqa: E402
+
+PDF = b"%PDF-1.4\n% round-trip check\n%%EOF\n"
+
+
+class Inbox:
+    """aiosmtpd handler that keeps every delivered message and counts sessions."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        from email import message_from_bytes, policy
+
+        self.messages.append((envelope.rcpt_tos, message_from_bytes(envelope.content, policy=policy.default)))
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("aiosmtpd is required: pip install aiosmtpd")
+
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    failures = []
+
+    def check(ok, what):
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    try:
+        settings = SMTPSettings(controller.hostname, controller.port, "wizard@example.com", use_ssl=False, timeout=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = MailQueue(os.path.join(tmp, "outbox.sqlite3"), per_recipient_limit=2, lease_seconds=1)
+
+            # Delivery, connection reuse and a poison job, all in one batch
+            worker = MailWorker(queue, settings, poll_interval=0.1)
+            for i in range(3):
+                queue.enqueue(f"student{i}@example.com", f"List {i}", "Your list is attached.", PDF, "list.pdf")
+            bad = queue.enqueue("evil@example.com\r\nBcc: victim@example.com", "x", "x")
+            worker.start()
+            sent = wait_for(lambda: queue.counts().get("sent", 0) == 3 and queue.counts().get("failed", 0) == 1)
+            check(sent, "3 messages sent and the malformed one failed")
+            check(len(inbox.messages) == 3, f"3 messages received (got {len(inbox.messages)})")
+            check(all(msg.get_content_type() == "multipart/mixed" and
+                      next(msg.iter_attachments()).get_content() == PDF for _, msg in inbox.messages),
+                  "every message carries the PDF attachment")
+            check(inbox.sessions == 1, f"one SMTP session for the batch (got {inbox.sessions})")
+            with sqlite3.connect(queue.path) as conn:
+                (error,) = conn.execute("SELECT last_error FROM mail_jobs WHERE id = ?", (bad,)).fetchone()
+            check(error and error.startswith("ValueError"), f"malformed job records its error ({error})")
+
+            worker.enqueue("late@example.com", "Late", "Still running?")
+            check(wait_for(lambda: len(inbox.messages) == 4), "worker keeps running after the failed job")
+            worker.stop()
+
+            # Leases: a job claimed by a live worker isn't taken over until its lease expires
+            job = queue.enqueue("leased@example.com", "Leased", "Only once, please.")
+            queue.claim_due("someone-else")
+            other = MailWorker(queue, settings)
+            check(other.run_once() == 0, "a second worker leaves a leased job alone")
+            time.sleep(1.1)
+            check(other.run_once() == 1, "an expired lease is claimed again")
+            other.stop()
+            check(sum(rcpt == ["leased@example.com"] for rcpt, _ in inbox.messages) == 1,
+                  f"leased job {job} delivered exactly once")
+
+            # Rate limit
+            queue.enqueue("busy@example.com", "1", "1")
+            queue.enqueue("busy@example.com", "2", "2")
+            try:
+                queue.enqueue("busy@example.com", "3", "3")
+                check(False, "third message within the window is rejected")
+            except RateLimitExceeded:
+                check(True, "third message within the window is rejected")
+    finally:
+        controller.stop()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
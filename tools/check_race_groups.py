@@ -0,0 +1,65 @@
+"""Fail when the Fun Data Corner race charts count different profiles than the old page.
+
+The page used to group ethnicities with its own norm_race() on the raw CSV;
+it now reads the Eth_norm column prepared at ingest (aggregates.race_scores).
+This prepares a dataset CSV both ways and compares profiles per race group.
+
+    python tools/check_race_groups.py master_data.csv
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from aggregates import RACE_GROUPS, race_scores  # noqa: E402
+from ingest import prepare_dataset  # noqa: E402
+
+
+def norm_race(e):
+    # Copied from the old pages/01_Fun_Data_Corner.py load_and_prepare_data()
+    if pd.isna(e): return None
+    e = e.lower()
+    if any(x in e for x in ["indian","south asian","asian"]): return "Asian"
+    if "white" in e or "caucasian" in e: return "White"
+    if "black" in e or "african" in e: return "Black"
+    if any(x in e for x in ["hispanic","latino","latina","latinx"]): return "Hispanic"
+    return None
+
+
+def old_counts(raw):
+    df = raw.copy()
+    df['RaceNorm'] = df['Ethnicity'].apply(norm_race)
+    df['SAT_Adjusted'] = df['SAT_Score'].where(df['SAT_Score'].notna(), df['ACT_Score'] * 45)
+    df = df.dropna(subset=['RaceNorm', 'SAT_Adjusted'])
+    df = df[(df['SAT_Adjusted'] >= 1100) & (df['SAT_Adjusted'] <= 1600)]
+    return df['RaceNorm'].value_counts()
+
+
+def new_counts(raw):
+    race, _ = race_scores(prepare_dataset(raw))
+    return pd.Series(race).value_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", nargs="?", default=os.path.join(ROOT, "master_data.csv"),
+                        help="dataset CSV (same schema as master_data.csv)")
+    args = parser.parse_args()
+
+    raw = pd.read_csv(args.csv)
+    old, new = old_counts(raw), new_counts(raw)
+    failed = False
+    print(f"{'group':<10} {'old page':>9} {'now':>9}")
+    for group in RACE_GROUPS.values():
+        o, n = int(old.get(group, 0)), int(new.get(group, 0))
+        print(f"{group:<10} {o:>9} {n:>9}{'' if o == n else '  MISMATCH'}")
+        failed |= o != n
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ——— Histograms ———
+# Fixed bucket upper bounds, Prometheus style; the last bucket is +Inf
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROWS_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+# Set MATCHMYAPP_TRACING=0 to make spans no-ops
+ENABLED = os.environ.get("MATCHMYAPP_TRACING", "1") != "0"
+
+
+class Histogram:
+    """Counts per bucket plus sum, count and max. Not thread-safe on its own."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs ending with +Inf."""
+        total, out = 0, []
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+
+class Registry:
+    """Per-stage latency and row-count histograms for this server process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seconds = {}
+        self._rows = {}
+        self._errors = {}
+
+    def observe(self, stage, seconds, rows=None, error=False):
+        with self._lock:
+            if stage not in self._seconds:
+                self._seconds[stage] = Histogram(SECONDS_BUCKETS)
+                self._rows[stage] = Histogram(ROWS_BUCKETS)
+                self._errors[stage] = 0
+            self._seconds[stage].observe(seconds)
+            if rows is not None:
+                self._rows[stage].observe(rows)
+            if error:
+                self._errors[stage] += 1
+
+    def reset(self):
+        with self._lock:
+            self._seconds.clear()
+            self._rows.clear()
+            self._errors.clear()
+
+    def summary(self):
+        """One dict per stage, slowest total time first, times in milliseconds."""
+        with self._lock:
+            out = []
+            for stage, h in self._seconds.items():
+                rows = self._rows[stage]
+                out.append({
+                    "stage": stage,
+                    "calls": h.count,
+                    "errors": self._errors[stage],
+                    "total_ms": h.sum * 1000,
+                    "mean_ms": h.sum / h.count * 1000,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "max_ms": h.max * 1000,
+                    "mean_rows": rows.sum / rows.count if rows.count else None,
+                    "max_rows": rows.max if rows.count else None,
+                })
+        return sorted(out, key=lambda s: -s["total_ms"])
+
+    def to_json(self):
+        """Summary plus raw buckets, for offline analysis."""
+        with self._lock:
+            buckets = {
+                stage: {
+                    "seconds": [[b, n] for b, n in self._seconds[stage].cumulative()],
+                    "rows": [[b, n] for b, n in self._rows[stage].cumulative()],
+                }
+                for stage in self._seconds
+            }
+        # +Inf isn't valid JSON; export it as null
+        for stage in buckets.values():
+            for pairs in stage.values():
+                pairs[-1][0] = None
+        return json.dumps({"generated_at": time.time(), "stages": self.summary(), "buckets": buckets}, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for metric, hists, help_text in (
+                ("matchmyapp_stage_seconds", self._seconds, "Wall time per stage."),
+                ("matchmyapp_stage_rows", self._rows, "Rows produced per stage."),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for stage, h in sorted(hists.items()):
+                    for bound, n in h.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{le}"}} {n}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {h.sum!r}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {h.count}')
+            lines += ["# HELP matchmyapp_stage_errors_total Spans that raised.",
+                      "# TYPE matchmyapp_stage_errors_total counter"]
+            for stage, n in sorted(self._errors.items()):
+                lines.append(f'matchmyapp_stage_errors_total{{stage="{stage}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ——— Spans ———
+class Span:
+    """Handed to the body of a span; set .rows to record how many rows it produced."""
+    __slots__ = ("stage", "rows")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.rows = None
+
+
+@contextmanager
+def span(stage, registry=None):
+    """Time the enclosed block under stage.
+
+        with span("wizard.filter") as s:
+            rows = wizard_rows(...)
+            s.rows = len(rows)
+    """
+    s = Span(stage)
+    if not ENABLED:
+        yield s
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield s
+    except BaseException:
+        error = True
+        raise
+    finally:
+        (registry or REGISTRY).observe(stage, time.perf_counter() - start, s.rows, error)
+
+
+def traced(stage=None):
+    """Decorator form of span(); records len(result) as rows when it has one."""
+    def decorate(fn):
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name) as s:
+                result = fn(*args, **kwargs)
+                if hasattr(result, "__len__"):
+                    s.rows = len(result)
+                return result
+        return wrapper
+    return decorate
+
+
+# ——— Export ———
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body, ctype = self.registry.to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body, ctype = self.registry.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass  # scrapes would otherwise flood the Streamlit log
+
+
+def serve_metrics(port, host="127.0.0.1", registry=None):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread.
+
+    Returns the server; port 0 picks a free port (see server.server_port).
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or REGISTRY})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,136 @@
+from collections import Counter
+
+import numpy as np
+
+from filters import column_values, ec_rows, wizard_rows
+from normalize import extract_keywords
+from tracing import span
+
+
+# ——— School Aggregation ———
+# Scales match the wizard's match windows (±0.1 GPA, ±30 SAT), so a profile
+# at the edge of both windows is as far away as one at the edge of either.
+GPA_SCALE = 0.1
+SCORE_SCALE = 30.0
+
+
+def closeness_order(df, rows, gpa=None, sat=None):
+    """rows sorted by distance to the user's GPA / unified SAT, nearest first.
+
+    Profiles missing a stat the user gave sort after every complete one;
+    ties keep dataset order.
+    """
+    rows = np.asarray(rows)
+    distance = np.zeros(len(rows))
+    if gpa is not None:
+        distance += np.abs(column_values(df, 'GPA', rows) - gpa) / GPA_SCALE
+    if sat is not None:
+        distance += np.abs(column_values(df, 'SAT_Adjusted', rows) - sat) / SCORE_SCALE
+    distance = np.nan_to_num(distance, nan=np.inf)
+    return rows[np.argsort(distance, kind="stable")]
+
+
+def aggregate_schools(df, rows, gpa=None, sat=None, examples_per_school=3):
+    """Acceptance counts and example post URLs per school in one pass.
+
+    Returns (Counter of school -> acceptances, dict of school -> up to
+    examples_per_school URLs). Walking the rows nearest-first means each
+    school's examples are the closest profiles to the user.
+    """
+    ordered = closeness_order(df, rows, gpa, sat)
+    # Only the selected rows leave their Arrow buffers
+    college_lists = df['college_list'].iloc[ordered].tolist()
+    urls = df['url'].iloc[ordered].tolist()
+
+    counts = Counter()
+    examples = {}
+    for schools, url in zip(college_lists, urls):
+        for school in schools:
+            counts[school] += 1
+            picked = examples.setdefault(school, [])
+            if len(picked) < examples_per_school and url not in picked:
+                picked.append(url)
+    return counts, examples
+
+
+# ——— College List Pipeline ———
+# The College List Wizard's work, from raw form inputs to the arguments of
+# report.render_college_list(). Shared by the app and the batch CLI.
+TOP_SCHOOLS = 10
+TOP_PROFILES = 10
+
+
+def parse_gpa(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_test_score(text):
+    """(SAT, ACT) from one score box: 1–36 is an ACT (also given as SAT ×45), 400–1600 an SAT."""
+    text = str(text).strip()
+    if not text.isdigit():
+        return None, None
+    score = int(text)
+    if 1 <= score <= 36:
+        return score * 45, score
+    if 400 <= score <= 1600:
+        return score, None
+    return None, None
+
+
+def match_major(user_major, majors_list):
+    """First major in majors_list containing user_major, case-insensitively."""
+    user_major_lower = user_major.strip().lower()
+    for m in majors_list:
+        if user_major_lower in m.lower():
+            return m
+    return None
+
+
+def college_list(ds, gpa, test_score, major, ecs, domestic, email="", min_ec_score=0.0):
+    """Match the wizard inputs (as typed) against ds.
+
+    Profiles whose ECs score below min_ec_score (TF-IDF cosine similarity,
+    0-1) are dropped. Returns (matched rows, inputs, schools, profiles): the
+    rows nearest-EC first, then the three arguments of
+    report.render_college_list().
+    """
+    df = ds.frame
+    gpa_val = parse_gpa(gpa)
+    sat_val, act_val = parse_test_score(test_score)
+    matched_major = match_major(major, ds.majors)
+
+    # Residency, GPA, SAT/ACT and major in a single vectorized pass
+    target_res = "domestic" if domestic else "international"
+    with span("wizard.filter") as s:
+        rows = wizard_rows(ds, gpa_val, sat_val, act_val, target_res, matched_major)
+        s.rows = len(rows)
+
+    ec_keys = extract_keywords(ecs)
+    if ec_keys:
+        # Most similar ECs first, so "Profiles Like Yours" leads with them
+        with span("wizard.ec") as s:
+            rows, _, _ = ec_rows(ds, ec_keys, min_hits=1, rows=rows, min_score=min_ec_score)
+            s.rows = len(rows)
+
+    with span("wizard.aggregate") as s:
+        counts, examples = aggregate_schools(df, rows, gpa_val, sat_val)
+        s.rows = len(counts)
+
+    inputs = [
+        ("GPA", gpa),
+        ("SAT", str(sat_val) if sat_val else "N/A"),
+        ("ACT", str(act_val) if act_val else "N/A"),
+        ("Major", major if major else "N/A"),
+        ("Residency", "Domestic" if domestic else "International"),
+        ("Extracurriculars", ecs if ecs.strip() else "N/A"),
+        ("Email", email if email else "N/A"),
+    ]
+    schools = [(school, cnt, examples[school]) for school, cnt in counts.most_common(TOP_SCHOOLS)]
+    profiles = [
+        (row['url'], f"GPA {row.get('GPA')}, SAT {row.get('SAT_Score')}, ACT {row.get('ACT_Score')}, Major {row.get('Major')}")
+        for _, row in df.iloc[rows[:TOP_PROFILES]].iterrows()
+    ]
+    return rows, inputs, schools, profiles